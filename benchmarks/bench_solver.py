@@ -0,0 +1,223 @@
+"""
+Benchmark suite for solver loading, single solves and workflow runs.
+
+Times, separately:
+- SymbolicSolver.load_from_database per domain (without and with the rule cache)
+- AutoSubstitutionDetector.detect_substitutions
+- cold (no compiled plan) and warm mechanics.solve for every equation in PHYSICS_DB
+- HydraulicCylinderWorkflow.run (default, fast_units and memoized)
+- import time and cold start in fresh interpreters (see bench_startup)
+
+Results are written as JSON and can be compared against a stored baseline:
+
+    python -m benchmarks.bench_solver --output bench_results.json --compare benchmarks/baseline.json
+    python -m benchmarks.bench_solver --save-baseline
+
+Every run also times a fixed reference workload (sympy solving plus plain
+Python arithmetic, independent of this code base). Comparisons scale the
+baseline by the ratio of the two reference timings, so a baseline recorded on
+another machine still applies. A benchmark regresses when its median exceeds the
+scaled baseline median by more than `--threshold` (default 2x) and by more than
+`--min-delta` seconds; the command then exits with status 1. `--absolute`
+compares raw medians instead. That check is advisory only and never fails.
+"""
+import argparse
+import json
+import math
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict
+
+import numpy as np
+import pint
+import sympy as sp
+
+from benchmarks.bench_startup import bench_startup
+from zylo.core.data.physics_db import PHYSICS_DB
+from zylo.core.math import result_cache, rule_cache
+from zylo.core.math.symbolic_solver import SymbolicSolver
+from zylo.core.physics.conversions import ureg
+from zylo.core.physics.mechanics import DOMAINS, mechanics
+from zylo.core.workflow.hydraulic_cylinder_workflow import HydraulicCylinderWorkflow
+
+BASELINE_PATH = Path(__file__).with_name('baseline.json')
+REFERENCE = 'reference_workload'
+
+
+def measure(func: Callable, repeats: int, setup: Callable = None) -> Dict[str, float]:
+    """Median/min wall time of `func` over `repeats` runs; `setup` runs untimed before each."""
+    times = []
+    for _ in range(repeats):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return {'median': statistics.median(times), 'min': min(times), 'repeats': repeats}
+
+
+def reference_workload():
+    """Fixed sympy and pure-Python work that normalizes timings for machine speed."""
+    x, y = sp.symbols('x y', positive=True)
+    solution = sp.solve(sp.Eq(y, x**2 / 2 + 3 * x), x)[0]
+    kernel = sp.lambdify(y, solution)
+    sum(kernel(i) + math.sqrt(i) for i in range(20_000))
+
+
+def bench_reference(results: Dict, repeats: int):
+    results[REFERENCE] = measure(reference_workload, max(repeats, 9), setup=sp.core.cache.clear_cache)
+
+
+def bench_loading(results: Dict, repeats: int):
+    for domain in PHYSICS_DB['domains']:
+        results[f'load_from_database[{domain}]'] = measure(
+            lambda: SymbolicSolver().load_from_database([domain], use_cache=False), repeats)
+        SymbolicSolver().load_from_database([domain])
+        results[f'load_from_database_cached[{domain}]'] = measure(
+            lambda: SymbolicSolver().load_from_database([domain]), repeats)
+
+    solver = SymbolicSolver()
+    solver.load_from_database(DOMAINS, use_cache=False)
+
+    def reset_rules():
+        solver.substitution_rules = {}
+        solver._clear_plans()
+
+    results['detect_substitutions'] = measure(solver.auto_detector.detect_substitutions, repeats, setup=reset_rules)
+
+
+def solve_inputs(solver: SymbolicSolver, equation_name: str):
+    """Known inputs (every variable but the output) with distinct representative magnitudes."""
+    metadata = solver.auto_detector.equation_metadata.get(equation_name, {})
+    variables = sorted(solver.equation_variables(equation_name))
+    target = metadata.get('output', variables[0])
+    return {var: (1.5 + 0.25 * i) * solver.unit_map[var] for i, var in enumerate(variables) if var != target}
+
+
+def bench_solves(results: Dict, repeats: int):
+    calc = mechanics("Benchmark")
+    calc.solver = calc.solver.copy()
+    for equation_name in calc.solver.equations:
+        inputs = solve_inputs(calc.solver, equation_name)
+        solve = lambda: calc.solve(equation_name, **inputs)
+        results[f'solve_cold[{equation_name}]'] = measure(solve, repeats, setup=calc.solver._clear_plans)
+        solve()
+        results[f'solve_warm[{equation_name}]'] = measure(solve, repeats * 10)
+
+
+def bench_workflow(results: Dict, repeats: int):
+    inputs = dict(force=1000 * ureg.kilonewton, pressure=300 * ureg.bar, stroke=1.0 * ureg.meter,
+                  material_name='S355', safety_factor=2.0)
+    maxsize = result_cache.WORKFLOW_CACHE.maxsize
+    # Measure the pipeline itself, then the memoized path separately
+    result_cache.WORKFLOW_CACHE.maxsize = 0
+    try:
+        for fast_units in (False, True):
+            run = lambda: HydraulicCylinderWorkflow(**inputs, fast_units=fast_units).run()
+            run()
+            name = 'workflow_run_fast_units' if fast_units else 'workflow_run'
+            results[name] = measure(run, repeats * 10)
+    finally:
+        result_cache.WORKFLOW_CACHE.maxsize = maxsize
+    run = lambda: HydraulicCylinderWorkflow(**inputs).run()
+    run()
+    results['workflow_run_memoized'] = measure(run, repeats * 10)
+
+
+def run_benchmarks(repeats: int = 5) -> Dict:
+    # Keep the rule cache out of the user's cache directory and start it empty
+    with tempfile.TemporaryDirectory() as cache_dir:
+        rule_cache.CACHE_DIR = Path(cache_dir)
+        results = {}
+        bench_reference(results, repeats)
+        bench_loading(results, repeats)
+        bench_solves(results, repeats)
+        bench_workflow(results, repeats)
+        bench_startup(results, repeats)
+    return {
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'sympy': sp.__version__,
+            'numpy': np.__version__,
+            'pint': pint.__version__,
+        },
+        'results': results,
+    }
+
+
+def machine_scale(current: Dict, baseline: Dict) -> float:
+    """How much slower this run's machine is than the baseline's, from the reference workload."""
+    ours, theirs = current['results'].get(REFERENCE), baseline['results'].get(REFERENCE)
+    if ours is None or theirs is None:
+        return 1.0
+    return ours['min'] / theirs['min']
+
+
+def compare(current: Dict, baseline: Dict, threshold: float, min_delta: float = 0.0, scale: float = 1.0) -> list:
+    """Print a comparison table; return the names of regressed benchmarks.
+
+    Baseline medians are multiplied by `scale` (see machine_scale). Slowdowns smaller
+    than `min_delta` seconds are treated as timer noise.
+    """
+    regressions = []
+    print(f"{'benchmark':<50} {'baseline':>12} {'current':>12} {'ratio':>7}")
+    for name, result in current['results'].items():
+        reference = baseline['results'].get(name)
+        if reference is None:
+            print(f"{name:<50} {'-':>12} {result['median']:>12.6f} {'new':>7}")
+            continue
+        expected = reference['median'] * (1.0 if name == REFERENCE else scale)
+        ratio = result['median'] / expected if expected else float('inf')
+        slower = ratio > threshold and result['median'] - expected > min_delta
+        flag = ' REGRESSION' if slower else ''
+        print(f"{name:<50} {expected:>12.6f} {result['median']:>12.6f} {ratio:>7.2f}{flag}")
+        if flag:
+            regressions.append(name)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Zylo solver benchmarks.")
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--output', type=Path, help="Write results JSON here")
+    parser.add_argument('--compare', type=Path, nargs='?', const=BASELINE_PATH, help="Baseline JSON to compare against")
+    parser.add_argument('--threshold', type=float, default=2.0, help="Allowed median slowdown ratio")
+    parser.add_argument('--min-delta', type=float, default=2e-5, help="Ignore slowdowns below this many seconds")
+    parser.add_argument('--absolute', action='store_true',
+                        help="Compare raw medians without the reference scaling; report only, never fail")
+    parser.add_argument('--save-baseline', action='store_true', help=f"Overwrite {BASELINE_PATH.name}")
+    args = parser.parse_args(argv)
+
+    current = run_benchmarks(args.repeats)
+    if args.output:
+        args.output.write_text(json.dumps(current, indent=2))
+    if args.save_baseline:
+        BASELINE_PATH.write_text(json.dumps(current, indent=2))
+    if args.compare:
+        baseline = json.loads(args.compare.read_text())
+        scale = 1.0 if args.absolute else machine_scale(current, baseline)
+        if not args.absolute:
+            if REFERENCE not in baseline['results']:
+                print(f"{args.compare} has no {REFERENCE}; comparing raw medians (advisory)", file=sys.stderr)
+            print(f"Baseline scaled by {scale:.2f} (reference workload, this machine vs. baseline)")
+        regressions = compare(current, baseline, args.threshold, args.min_delta, scale)
+        if regressions:
+            print(f"\n{len(regressions)} benchmark(s) slower than {args.threshold}x baseline", file=sys.stderr)
+            # Raw timings from another machine or run are not a reliable gate
+            if args.absolute or REFERENCE not in baseline['results']:
+                return 0
+            return 1
+    elif not args.output and not args.save_baseline:
+        print(json.dumps(current, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
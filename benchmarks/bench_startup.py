@@ -0,0 +1,77 @@
+"""
+Startup-time benchmark: import cost and cold start of fresh interpreters.
+
+Each measurement runs in a new `python -X importtime` subprocess, so nothing is
+shared with the calling process:
+
+- import[<module>]: time to import a zylo module (and its packages)
+- cold_start: imports plus a first HydraulicCylinderWorkflow.run(), as in main.py
+
+The rule and unit caches (in rule_cache.CACHE_DIR) are warmed once first, so the
+numbers reflect a normal (not first-ever) start. `bench_solver` includes these
+results in its JSON and baseline comparison; run this module directly for a
+per-module report:
+
+    python -m benchmarks.bench_startup --top 20
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from zylo.core.math import rule_cache
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+MODULES = ['zylo.core.physics.mechanics', 'zylo.core.workflow.hydraulic_cylinder_workflow']
+COLD_START = (
+    "from zylo.core.physics.conversions import ureg\n"
+    "from zylo.core.workflow.hydraulic_cylinder_workflow import HydraulicCylinderWorkflow\n"
+    "HydraulicCylinderWorkflow(1000 * ureg.kilonewton, 300 * ureg.bar, 1.0 * ureg.meter, 'S355', 2.0).run()\n"
+)
+IMPORTTIME_LINE = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)')
+
+
+def run_importtime(code: str) -> Tuple[float, List[Tuple[str, float, float]]]:
+    """Run `code` in a fresh interpreter; return (wall time, [(module, self s, cumulative s)])."""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [str(REPO_ROOT), os.environ.get('PYTHONPATH')])),
+               ZYLO_CACHE_DIR=str(rule_cache.CACHE_DIR))
+    wrapped = f"import time\n_start = time.perf_counter()\n{code}\nprint(time.perf_counter() - _start)\n"
+    completed = subprocess.run([sys.executable, '-X', 'importtime', '-c', wrapped], capture_output=True,
+                               text=True, env=env, cwd=REPO_ROOT, check=True)
+    modules = [(match.group(4), int(match.group(1)) / 1e6, int(match.group(2)) / 1e6)
+               for match in map(IMPORTTIME_LINE.match, completed.stderr.splitlines()) if match]
+    return float(completed.stdout.strip().splitlines()[-1]), modules
+
+
+def bench_startup(results: Dict, repeats: int):
+    run_importtime(COLD_START)  # warm the rule and unit caches
+    for name, code in [(f'import[{module}]', f"import {module}") for module in MODULES] + [('cold_start', COLD_START)]:
+        times = [run_importtime(code)[0] for _ in range(repeats)]
+        results[name] = {'median': statistics.median(times), 'min': min(times), 'repeats': repeats}
+
+
+def report(code: str, top: int):
+    """Print the slowest imports of `code` by self and cumulative time."""
+    run_importtime(code)
+    wall, modules = run_importtime(code)
+    print(f"wall time: {wall * 1e3:.1f} ms, {len(modules)} modules imported")
+    for title, column in (('self', 1), ('cumulative', 2)):
+        print(f"\n{'module':<60} {title + ' [ms]':>16}")
+        for entry in sorted(modules, key=lambda m: m[column], reverse=True)[:top]:
+            print(f"{entry[0]:<60} {entry[column] * 1e3:>16.1f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Zylo startup-time report (python -X importtime).")
+    parser.add_argument('--module', help="Report `import MODULE` instead of the cold start script")
+    parser.add_argument('--top', type=int, default=15)
+    args = parser.parse_args(argv)
+    report(f"import {args.module}" if args.module else COLD_START, args.top)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,154 @@
+"""
+Stress test for sharing one SymbolicSolver between threads.
+
+Threads start together on a cold solver and solve every equation for each of its
+variables, the cylinder sizing system and its gradients, in a different order per
+thread and with several input sets. Each result must match a single-threaded
+reference solve (the same value, or the same exception type). Scenarios:
+
+- frozen: the read-only snapshot the solver registry shares
+- lazy: a lazily loaded solver that parses equations while the threads solve
+- mutating: a mutable copy while a writer thread keeps adding and removing an
+  equation, so rules, plans and the rule index change under the readers
+
+    python -m benchmarks.stress_threads --threads 16 --rounds 3
+
+The interpreter's thread switch interval is shortened while the threads run, so
+races show up far more often than under the default 5 ms. Exits with status 1 if
+any call disagrees with the reference.
+"""
+import argparse
+import math
+import random
+import sys
+import threading
+import time
+from typing import Callable, Dict, List, Tuple
+
+from zylo.core.math.symbolic_solver import SymbolicSolver
+from zylo.core.physics.mechanics import DOMAINS
+from zylo.core.workflow.hydraulic_cylinder_workflow import SIZING_EQUATIONS
+
+SCALES = (1.0, 1.1, 1.3)
+SIZING_INPUTS = {'P': 3e7, 'F': 1e6, 'yield_strength': 3.55e8, 'safety_factor': 2.0}
+
+
+def load(lazy: bool = False) -> SymbolicSolver:
+    solver = SymbolicSolver()
+    solver.load_from_database(DOMAINS, lazy=lazy)
+    return solver if lazy else solver.freeze()
+
+
+def calls(solver: SymbolicSolver) -> List[Tuple[str, Callable[[SymbolicSolver], object]]]:
+    """(label, call) for every solve direction, the sizing system and its gradients, per input scale."""
+    result = []
+    for scale in SCALES:
+        for name in sorted(solver.equations):
+            variables = sorted(solver.equation_variables(name))
+            for target in variables:
+                known = {var: (1.5 + 0.25 * i) * scale for i, var in enumerate(variables) if var != target}
+                result.append((f'{name}->{target}@{scale}',
+                               lambda s, name=name, known=known: s.solve_value(name, s.equation_variables(name), **known)))
+        known = {var: value * scale for var, value in SIZING_INPUTS.items()}
+        result.append((f'sizing@{scale}', lambda s, known=known: s.solve_system_values(SIZING_EQUATIONS, known, ['t', 'd'])))
+        result.append((f'gradient[kessel]@{scale}',
+                       lambda s, known=known: s.gradient('kessel', s.equation_variables('kessel'), **known)))
+    return result
+
+
+def outcome(call: Callable, solver: SymbolicSolver):
+    try:
+        value = call(solver)
+    except Exception as e:
+        return type(e).__name__
+    if isinstance(value, dict):
+        return {key: getattr(item, 'magnitude', item) for key, item in value.items()}
+    return value
+
+
+def same(a, b) -> bool:
+    if isinstance(a, dict) and isinstance(b, dict):
+        return a.keys() == b.keys() and all(same(a[key], b[key]) for key in a)
+    if isinstance(a, float) and isinstance(b, float):
+        return math.isclose(a, b, rel_tol=1e-9) or (math.isnan(a) and math.isnan(b))
+    return a == b
+
+
+def mutate(solver: SymbolicSolver, stop: threading.Event) -> int:
+    """Add and remove an equation over a new symbol until `stop`; returns the number of mutations."""
+    solver.add_symbols({'stress_load': {}})
+    n = 0
+    while not stop.is_set():
+        solver.add_equation_incremental('stress_extra', 'stress_load = F / A')
+        solver.remove_equation('stress_extra')
+        n += 2
+    return n
+
+
+def run_scenario(name: str, solver: SymbolicSolver, reference: Dict[str, object], work, threads: int,
+                 rounds: int) -> Dict:
+    barrier = threading.Barrier(threads)
+    failures, done = [], [0] * threads
+
+    def worker(index: int):
+        order = list(work) * rounds
+        random.Random(index).shuffle(order)
+        barrier.wait()
+        for label, call in order:
+            result = outcome(call, solver)
+            if not same(result, reference[label]):
+                failures.append((label, result, reference[label]))
+            done[index] += 1
+
+    stop = threading.Event()
+    writer_result = []
+    writer = threading.Thread(target=lambda: writer_result.append(mutate(solver, stop))) if name == 'mutating' else None
+    pool = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    start = time.perf_counter()
+    if writer:
+        writer.start()
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    stop.set()
+    if writer:
+        writer.join()
+    elapsed = time.perf_counter() - start
+    return {'calls': sum(done), 'failures': failures, 'seconds': elapsed,
+            'mutations': writer_result[0] if writer_result else 0}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stress test one shared SymbolicSolver from many threads.")
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--rounds', type=int, default=2, help="Passes over all calls per thread")
+    parser.add_argument('--switch-interval', type=float, default=1e-5, help="sys.setswitchinterval while running")
+    parser.add_argument('--scenario', choices=['frozen', 'lazy', 'mutating'], action='append',
+                        help="Run only these scenarios (default: all)")
+    args = parser.parse_args(argv)
+
+    single = load()
+    work = calls(single)
+    reference = {label: outcome(call, single) for label, call in work}
+    factories = {'frozen': load, 'lazy': lambda: load(lazy=True), 'mutating': lambda: load().copy()}
+    failed = False
+    for name in args.scenario or list(factories):
+        solver = factories[name]()
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(args.switch_interval)
+        try:
+            stats = run_scenario(name, solver, reference, work, args.threads, args.rounds)
+        finally:
+            sys.setswitchinterval(interval)
+        extra = f", {stats['mutations']} mutations" if name == 'mutating' else ''
+        print(f"{name:>9}: {stats['calls']} calls on {args.threads} threads in {stats['seconds']:.2f}s{extra}, "
+              f"{len(stats['failures'])} failures")
+        for label, got, expected in stats['failures'][:10]:
+            print(f"    {label}: got {got!r}, expected {expected!r}", file=sys.stderr)
+        failed = failed or bool(stats['failures'])
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
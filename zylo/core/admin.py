@@ -1,3 +1,9 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import Domain, Equation, Material, RuleSet, Symbol
+
+admin.site.register(Domain)
+admin.site.register(Symbol)
+admin.site.register(Equation)
+admin.site.register(Material)
+admin.site.register(RuleSet)
@@ -0,0 +1,84 @@
+"""
+Asyncio support: CPU-bound solver work off the event loop, with request coalescing.
+
+`mechanics.solve_async` and `HydraulicCylinderWorkflow.run_async` answer memoized
+results and signatures with a compiled plan inline, since those are plain numeric
+evaluation. Anything that needs symbolic work (sp.solve, lambdify, rule loading) runs
+through `run_coalesced` on an executor:
+
+- Concurrent calls with the same key share one computation; each caller awaits it
+  through its own shield, so cancelling (or timing out) one caller leaves the others
+  running. When the last caller goes away, work that has not started is cancelled.
+- The executor is a thread pool of ZYLO_ASYNC_WORKERS threads (default 4) unless set
+  with `set_executor()` or passed per call. Symbolic work holds the GIL, so threads keep
+  the loop responsive rather than add throughput; the plans they compile are shared with
+  the calling process, so later calls with the same signature run inline. Callers submit
+  picklable module-level tasks, so a ProcessPoolExecutor works too (see
+  `mechanics.solve_async`).
+"""
+import asyncio
+import os
+import threading
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from zylo.core import metrics
+
+_executor: Optional[Executor] = None
+_lock = threading.Lock()
+# (event loop, key) -> [future, number of waiting callers]
+_inflight: Dict[Any, list] = {}
+
+
+def get_executor() -> Executor:
+    """The executor for offloaded solver work, created on first use."""
+    global _executor
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=int(os.environ.get('ZYLO_ASYNC_WORKERS') or 4),
+                                               thread_name_prefix='zylo-solve')
+    return _executor
+
+
+def set_executor(executor: Optional[Executor]):
+    """Use `executor` for offloaded work (None: back to the default thread pool)."""
+    global _executor
+    with _lock:
+        _executor = executor
+
+
+async def run_coalesced(key: Optional[Hashable], func: Callable[[], Any], executor: Executor = None,
+                        timeout: float = None) -> Any:
+    """Run `func` on the executor, sharing the result with concurrent calls for the same `key`.
+
+    `key=None` disables coalescing. Raises asyncio.TimeoutError after `timeout` seconds for this caller only.
+    """
+    loop = asyncio.get_running_loop()
+    executor = executor or get_executor()
+    if key is None:
+        metrics.count('async_offloaded')
+        return await asyncio.wait_for(loop.run_in_executor(executor, func), timeout)
+    slot = (loop, key)
+    entry = _inflight.get(slot)
+    if entry is None:
+        metrics.count('async_offloaded')
+        entry = _inflight[slot] = [loop.run_in_executor(executor, func), 0]
+        entry[0].add_done_callback(lambda future: _finished(slot, entry, future))
+    else:
+        metrics.count('async_coalesced')
+    entry[1] += 1
+    try:
+        return await asyncio.wait_for(asyncio.shield(entry[0]), timeout)
+    finally:
+        entry[1] -= 1
+        if entry[1] == 0 and not entry[0].done():
+            entry[0].cancel()
+
+
+def _finished(slot, entry, future):
+    if _inflight.get(slot) is entry:
+        del _inflight[slot]
+    # Retrieve the exception so one nobody waits for any more is not reported as unhandled
+    if not future.cancelled():
+        future.exception()
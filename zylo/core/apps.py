@@ -3,4 +3,6 @@ from django.apps import AppConfig
 
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'core'
+    # One import root inside and outside Django; the label keeps tables and migrations as 'core'
+    name = 'zylo.core'
+    label = 'core'
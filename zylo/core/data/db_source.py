@@ -0,0 +1,171 @@
+"""
+Physics data read from the Django models.
+
+When the `core` app is set up and its tables are populated (`manage.py
+load_physics_db`), SymbolicSolver.load_from_database reads domains, symbols and
+equations from the database with one query per table, and takes the parsed
+equations and substitution rules from the stored RuleSet instead of deriving
+them; `materials_db.materials()` reads the Material table. Outside Django
+(scripts, worker processes without settings) every function here returns None
+and the in-code PHYSICS_DB / MATERIALS_DB are used.
+
+Models are looked up through the app registry, so this module never imports
+Django unless Django is already loaded. Django refuses ORM queries on a thread
+running an event loop, so a solver first loaded from async code (e.g. the
+cylinder view) queries from a short-lived worker thread instead; the loop waits
+for that one-off load.
+"""
+import functools
+import logging
+import sys
+from typing import Any, Dict, List, Optional
+
+from zylo.core.math import rule_cache
+
+APP_LABEL = 'core'
+# Material columns and the units their floats are stored in (None: dimensionless)
+MATERIAL_UNITS = {
+    'yield_strength': 'pascal',
+    'ultimate_strength': 'pascal',
+    'density': 'kilogram / meter ** 3',
+    'young_modulus': 'pascal',
+    'poisson_ratio': None,
+    'thermal_expansion': '1 / kelvin',
+}
+
+
+def _model(name: str):
+    """Model class from the core app, or None if Django is not set up."""
+    if 'django.apps' not in sys.modules:
+        return None
+    from django.apps import apps
+    if not apps.ready:
+        return None
+    try:
+        return apps.get_model(APP_LABEL, name)
+    except LookupError:
+        return None
+
+
+def _sync_only(func):
+    """Run `func` on a worker thread when called from a running event loop with the app set up.
+
+    The caller still waits for the queries: solvers and the material catalog are loaded
+    synchronously, once, and cached. Without Django `func` returns None straight away.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        import asyncio
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return func(*args, **kwargs)
+        if _model('Domain') is None:
+            return func(*args, **kwargs)
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            return executor.submit(_closing_connections, func, *args, **kwargs).result()
+    return wrapper
+
+
+def _closing_connections(func, *args, **kwargs):
+    from django.db import connections
+    try:
+        return func(*args, **kwargs)
+    finally:
+        # The worker thread's connections would otherwise stay open until garbage collection
+        connections.close_all()
+
+
+@_sync_only
+def load_physics_db(domains: List[str] = None) -> Optional[Dict[str, Any]]:
+    """PHYSICS_DB-shaped dict for `domains` (all if None), or None if unavailable or empty."""
+    Domain = _model('Domain')
+    if Domain is None:
+        return None
+    from django.db import DatabaseError
+    Symbol, Equation = _model('Symbol'), _model('Equation')
+    try:
+        rows = Domain.objects.order_by('pk')
+        if domains is not None:
+            rows = rows.filter(name__in=domains)
+        names = list(rows.values_list('name', flat=True))
+        if not names or (domains is not None and len(names) < len(set(domains))):
+            return None
+        physics_db = {'domains': {name: {'symbols': {}, 'equations': {}} for name in (domains or names)}}
+        for domain, name, units, description in Symbol.objects.filter(domain__name__in=names).values_list(
+                'domain__name', 'name', 'units', 'description').order_by('domain__name', 'position'):
+            physics_db['domains'][domain]['symbols'][name] = {'units': units, 'description': description}
+        for domain, name, expression, metadata in Equation.objects.filter(domain__name__in=names).values_list(
+                'domain__name', 'name', 'expression', 'metadata').order_by('domain__name', 'position'):
+            physics_db['domains'][domain]['equations'][name] = {'expression': expression, **metadata}
+    except DatabaseError as e:
+        logging.warning(f"Physics tables unavailable, using PHYSICS_DB: {e}")
+        return None
+    return physics_db
+
+
+@_sync_only
+def load_materials() -> Optional[Dict[str, Dict[str, Any]]]:
+    """MATERIALS_DB-shaped dict from the Material table, or None if unavailable or empty."""
+    Material = _model('Material')
+    if Material is None:
+        return None
+    from django.db import DatabaseError
+    from zylo.core.physics.conversions import ureg
+    try:
+        rows = list(Material.objects.order_by('pk').values('name', 'type', *MATERIAL_UNITS))
+    except DatabaseError as e:
+        logging.warning(f"Material table unavailable, using MATERIALS_DB: {e}")
+        return None
+    if not rows:
+        return None
+    materials = {}
+    for row in rows:
+        material = {'type': row['type']}
+        for field, unit in MATERIAL_UNITS.items():
+            if row[field] is not None:
+                material[field] = row[field] if unit is None else ureg.Quantity(row[field], unit)
+        materials[row['name']] = material
+    return materials
+
+
+@_sync_only
+def load_rules(domains: List[str], physics_db: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Stored equations and rules for `domains`, or None if missing or derived from other data."""
+    RuleSet = _model('RuleSet')
+    if RuleSet is None:
+        return None
+    from django.db import DatabaseError
+    try:
+        row = RuleSet.objects.filter(domains=','.join(domains)).values_list('key', 'payload').first()
+    except DatabaseError:
+        return None
+    if row is None or row[0] != rule_cache.cache_key(domains, physics_db):
+        return None
+    try:
+        return rule_cache.loads(row[1])
+    except Exception as e:
+        logging.warning(f"Ignoring unreadable stored rules for {domains}: {e}")
+        return None
+
+
+@_sync_only
+def store_rules(domains: List[str], equations, substitution_rules, equation_metadata, physics_db: Dict[str, Any]):
+    """Store derived equations and rules for `domains` so later loads skip detection."""
+    RuleSet = _model('RuleSet')
+    if RuleSet is None:
+        return
+    from django.db import DatabaseError
+    key = rule_cache.cache_key(domains, physics_db)
+    payload = rule_cache.make_payload(key, dict(equations), substitution_rules, dict(equation_metadata))
+    try:
+        text = rule_cache.dumps(payload)
+    except ValueError as e:
+        logging.warning(f"Not storing rules for {domains}: {e}")
+        return
+    try:
+        RuleSet.objects.update_or_create(domains=','.join(domains), defaults={'key': key, 'payload': text})
+    except DatabaseError as e:
+        logging.warning(f"Could not store rules for {domains}: {e}")
+
@@ -145,4 +145,22 @@ MATERIALS_DB = {
         "poisson_ratio": 0.29,
         "thermal_expansion": 13e-6 / ureg.kelvin,
     },
-}
\ No newline at end of file
+}
+
+
+_catalog = None
+
+
+def materials() -> dict:
+    """The material catalog: the Material table when the Django app has one, else MATERIALS_DB."""
+    global _catalog
+    if _catalog is None:
+        from zylo.core.data import db_source
+        _catalog = db_source.load_materials() or MATERIALS_DB
+    return _catalog
+
+
+def clear():
+    """Read the catalog again on next use, e.g. after load_physics_db."""
+    global _catalog
+    _catalog = None
@@ -0,0 +1,134 @@
+"""
+Columnar view of the material catalog (`materials_db.materials()`) for vectorized queries.
+
+Every numeric property becomes one float64 array in SI base units (NaN where a
+material lacks it), with the unit recorded per column; text properties such as
+`type` become object arrays. Rows are addressed by a name index, so queries like
+"steels with yield/density above X, sorted by specific stiffness" are array
+expressions instead of loops over Quantities:
+
+    table = materials_table()
+    steels = table.filter(type='steel')
+    strong = steels.filter(steels['yield_strength'] / steels['density'] > 3e4)
+    strong.sort(strong['young_modulus'] / strong['density'], descending=True).names
+
+The catalog itself is unchanged; call `clear()` (or result_cache.invalidate())
+after editing it so the next `materials_table()` rebuilds.
+"""
+from typing import Any, Dict, Iterable, List, Union
+
+import numpy as np
+
+from zylo.core.physics.conversions import ureg, si_conversion
+from zylo.core.data.materials_db import materials
+
+
+class MaterialsTable:
+    """Materials as named columns; `table['density']` is an array over `table.names`."""
+
+    def __init__(self, names: List[str], columns: Dict[str, np.ndarray], units: Dict[str, Any]):
+        self.names = list(names)
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.columns = columns
+        # SI unit of each numeric column; None for text columns
+        self.units = units
+
+    @classmethod
+    def from_dict(cls, materials: Dict[str, Dict[str, Any]]) -> 'MaterialsTable':
+        names = list(materials)
+        properties = list(dict.fromkeys(key for data in materials.values() for key in data))
+        columns, units = {}, {}
+        for prop in properties:
+            values = [materials[name].get(prop) for name in names]
+            present = [value for value in values if value is not None]
+            if all(isinstance(value, str) for value in present):
+                columns[prop] = np.array(values, dtype=object)
+                units[prop] = None
+                continue
+            unit = getattr(present[0], 'units', ureg.dimensionless)
+            if si_conversion(unit)[0] != 1.0:
+                unit = ureg.Quantity(1.0, unit).to_base_units().units
+            columns[prop] = np.array([np.nan if value is None else ureg.Quantity(value).to(unit).magnitude
+                                      for value in values], dtype=float)
+            units[prop] = unit
+        return cls(names, columns, units)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.index
+
+    def __getitem__(self, prop: str) -> np.ndarray:
+        """SI magnitudes of a property, aligned with `names`."""
+        return self.columns[prop]
+
+    def quantity(self, prop: str):
+        """A numeric column as a Quantity array."""
+        return self.columns[prop] * self.units[prop]
+
+    def row(self, name: str) -> Dict[str, Any]:
+        """One material in the MATERIALS_DB form (Quantities in SI units, plain floats if dimensionless)."""
+        i = self.index[name]
+        row = {}
+        for prop, column in self.columns.items():
+            unit = self.units[prop]
+            if unit is None:
+                row[prop] = column[i]
+            elif not np.isnan(column[i]):
+                row[prop] = float(column[i]) if unit == ureg.dimensionless else column[i] * unit
+        return row
+
+    def positions(self, names: Iterable[str]) -> np.ndarray:
+        """Row indices of `names`; raises KeyError for unknown materials."""
+        return np.array([self.index[name] for name in names], dtype=int)
+
+    def take(self, rows: Union[np.ndarray, List[int]]) -> 'MaterialsTable':
+        """Sub-table of the given row indices or boolean mask, in that order."""
+        rows = np.asarray(rows)
+        if rows.dtype == bool:
+            rows = np.flatnonzero(rows)
+        return MaterialsTable([self.names[i] for i in rows],
+                              {prop: column[rows] for prop, column in self.columns.items()}, self.units)
+
+    def select(self, names: Iterable[str]) -> 'MaterialsTable':
+        return self.take(self.positions(names))
+
+    def filter(self, mask: np.ndarray = None, **equals) -> 'MaterialsTable':
+        """Rows where `mask` is true and every `column=value` matches, e.g. filter(type='steel')."""
+        keep = np.ones(len(self), dtype=bool) if mask is None else np.asarray(mask, dtype=bool)
+        for prop, value in equals.items():
+            keep = keep & (self.columns[prop] == value)
+        return self.take(keep)
+
+    def sort(self, key: Union[str, np.ndarray], descending: bool = False) -> 'MaterialsTable':
+        """Rows ordered by a column name or a derived array; NaN sorts last."""
+        return self.take(np.argsort(self._sort_keys(key, descending), kind='stable'))
+
+    def rank(self, key: Union[str, np.ndarray], descending: bool = True) -> np.ndarray:
+        """Rank of each row (0 = best) by a column name or derived array."""
+        order = np.argsort(self._sort_keys(key, descending), kind='stable')
+        ranks = np.empty(len(self), dtype=int)
+        ranks[order] = np.arange(len(self))
+        return ranks
+
+    def _sort_keys(self, key: Union[str, np.ndarray], descending: bool = False) -> np.ndarray:
+        values = self.columns[key] if isinstance(key, str) else np.asarray(key, dtype=float)
+        return -values if descending else values
+
+
+_table = None
+
+
+def materials_table() -> MaterialsTable:
+    """The columnar table for the material catalog, built on first use."""
+    global _table
+    if _table is None:
+        _table = MaterialsTable.from_dict(materials())
+    return _table
+
+
+def clear():
+    """Rebuild the table from the catalog on next use."""
+    global _table
+    _table = None
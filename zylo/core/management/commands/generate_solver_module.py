@@ -0,0 +1,27 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+
+from zylo.core.math import codegen, result_cache
+from zylo.core.physics.mechanics import DOMAINS
+
+
+class Command(BaseCommand):
+    help = ("Compile the common solve directions of the solver into a plain NumPy module "
+            "that solvers use instead of sympy (see zylo.core.math.codegen).")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--domains', default=','.join(DOMAINS),
+                            help="Comma-separated domain list; defaults to the mechanics calculator's domains")
+        parser.add_argument('--output', type=Path, default=codegen.DEFAULT_PATH,
+                            help=f"Module file to write (default {codegen.DEFAULT_PATH.name}, "
+                                 f"imported as {codegen.DEFAULT_MODULE})")
+        parser.add_argument('--no-workflow', action='store_true',
+                            help="Skip the cylinder workflow signatures; only solve every equation for each variable")
+
+    def handle(self, *args, **options):
+        domains = options['domains'].split(',')
+        count = codegen.generate(domains, options['output'], workflow=not options['no_workflow'] and domains == DOMAINS)
+        # Solvers and memoized results loaded before the module existed
+        result_cache.invalidate()
+        self.stdout.write(f"Wrote {count} plans for {','.join(domains)} to {options['output']}")
@@ -0,0 +1,76 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from zylo.core.models import Domain, Equation, Material, RuleSet, Symbol
+from zylo.core.data import db_source
+from zylo.core.data.materials_db import MATERIALS_DB
+from zylo.core.data.physics_db import PHYSICS_DB
+from zylo.core.math import result_cache
+from zylo.core.math.symbolic_solver import SymbolicSolver
+from zylo.core.physics.mechanics import DOMAINS
+
+
+class Command(BaseCommand):
+    help = ("Replace the physics and materials tables with PHYSICS_DB / MATERIALS_DB "
+            "and precompute the substitution rules for the given domain lists.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rules', action='append', metavar='DOMAINS',
+                            help="Comma-separated domain list to precompile rules for (repeatable); "
+                                 "defaults to all domains and the mechanics calculator's domains")
+        parser.add_argument('--no-rules', action='store_true', help="Only load the data")
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            counts = self.load_data()
+        self.stdout.write("Loaded {} domains, {} symbols, {} equations, {} materials".format(*counts))
+        if options['no_rules']:
+            return
+        if options['rules']:
+            domain_lists = [rules.split(',') for rules in options['rules']]
+        else:
+            domain_lists = [list(PHYSICS_DB['domains'])]
+            if DOMAINS not in domain_lists:
+                domain_lists.append(DOMAINS)
+        for domains in domain_lists:
+            solver = SymbolicSolver()
+            solver.load_from_database(domains)
+            rules = sum(len(rules) for rules in solver.substitution_rules.values())
+            self.stdout.write(f"Stored {rules} substitution rules for {','.join(domains)}")
+        # Snapshots and memoized results built from the old data are stale now
+        result_cache.invalidate()
+
+    def load_data(self):
+        RuleSet.objects.all().delete()
+        Material.objects.all().delete()
+        Domain.objects.all().delete()
+
+        domains = Domain.objects.bulk_create([Domain(name=name) for name in PHYSICS_DB['domains']])
+        symbols, equations = [], []
+        for domain in domains:
+            data = PHYSICS_DB['domains'][domain.name]
+            for position, (name, symbol) in enumerate(data['symbols'].items()):
+                symbols.append(Symbol(domain=domain, name=name, units=symbol.get('units', 'dimensionless'),
+                                      description=symbol.get('description', ''), position=position))
+            for position, (name, equation) in enumerate(data['equations'].items()):
+                if isinstance(equation, str):
+                    equation = {'expression': equation}
+                equations.append(Equation(domain=domain, name=name, expression=equation['expression'],
+                                          metadata={k: v for k, v in equation.items() if k != 'expression'},
+                                          position=position))
+        Symbol.objects.bulk_create(symbols)
+        Equation.objects.bulk_create(equations)
+
+        materials, skipped = [], set()
+        for name, data in MATERIALS_DB.items():
+            fields = {'type': data.get('type', '')}
+            for field, unit in db_source.MATERIAL_UNITS.items():
+                value = data.get(field)
+                if value is not None:
+                    fields[field] = value.to(unit).magnitude if unit and hasattr(value, 'to') else float(value)
+            skipped.update(set(data) - set(fields))
+            materials.append(Material(name=name, **fields))
+        Material.objects.bulk_create(materials)
+        if skipped:
+            self.stdout.write(f"Material properties without a column, not stored: {', '.join(sorted(skipped))}")
+        return len(domains), len(symbols), len(equations), len(materials)
@@ -7,16 +7,26 @@ class AutoSubstitutionDetector:
     def __init__(self, solver):
         self.solver = solver
         self.equation_metadata = {}
+        # Equation whose rules are being created; recorded on each rule
+        self.current_equation = None
     
     def detect_substitutions(self):
         """Auto-detect substitution rules using equation metadata."""
-        for eq_name, equation in self.solver.equations.items():
-            metadata = self.equation_metadata.get(eq_name)
-            
+        for eq_name in list(self.solver.equations):
+            self.detect_equation(eq_name)
+
+    def detect_equation(self, eq_name):
+        """Detect the substitution rules of a single equation."""
+        equation = self.solver.equations[eq_name]
+        metadata = self.equation_metadata.get(eq_name)
+        self.current_equation = eq_name
+        try:
             if metadata:
                 self._create_substitution_from_metadata(eq_name, equation, metadata)
             else:
                 self._generic_substitution_detection(eq_name, equation)
+        finally:
+            self.current_equation = None
     
     def _create_substitution_from_metadata(self, eq_name, equation, metadata):
         """Create substitution rules using explicit metadata."""
@@ -48,7 +58,8 @@ class AutoSubstitutionDetector:
                         target=target,
                         sources=other_symbols,
                         expression=solutions[0],
-                        priority=priority
+                        priority=priority,
+                        equation=self.current_equation
                     )
             except Exception:
                 continue
@@ -75,7 +86,8 @@ class AutoSubstitutionDetector:
                 target=target,
                 sources=sources,
                 expression=solution[0],
-                priority=priority
+                priority=priority,
+                equation=self.current_equation
             )
             
         except Exception:
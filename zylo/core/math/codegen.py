@@ -0,0 +1,224 @@
+"""
+Ahead-of-time generation of compiled solve plans as a plain NumPy module.
+
+`manage.py generate_solver_module` loads the solver for a domain list, compiles
+the common solve directions (every equation solved for each of its variables
+from the others, plus the signatures a cylinder workflow uses) and writes each
+closed-form, numeric-residual and system plan as a Python function after
+common-subexpression elimination:
+
+    def kessel__t__F_P_safety_factor_yield_strength(F, P, safety_factor, yield_strength):
+        _cse0 = ...
+        return ...
+
+A solver loaded for the same domains, data and solver code (checked through
+`plans_key`) takes plans from that module instead of calling sympy.solve and lambdify;
+other signatures, mutated solvers and stale modules fall back to symbolic
+solving. The module is zylo.core.math.generated_plans by default;
+ZYLO_GENERATED_PLANS names another one, and ZYLO_GENERATED_PLANS=0 disables
+the lookup.
+"""
+import functools
+import hashlib
+import importlib
+import keyword
+import logging
+import os
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+DEFAULT_MODULE = 'zylo.core.math.generated_plans'
+DEFAULT_PATH = Path(__file__).with_name('generated_plans.py')
+
+_modules = {}
+
+
+def module_name() -> Optional[str]:
+    name = os.environ.get('ZYLO_GENERATED_PLANS', DEFAULT_MODULE)
+    return None if name == '0' else name
+
+
+def plans_key(domains: List[str], physics_db: Dict[str, Any]) -> str:
+    """Content hash of the rule cache key and the code that compiles and renders the plans."""
+    from zylo.core.math import rule_cache
+    return hashlib.sha256(f'{rule_cache.cache_key(domains, physics_db)}|{_code_digest()}'.encode()).hexdigest()
+
+
+@functools.lru_cache(maxsize=None)
+def _code_digest() -> str:
+    from zylo.core.math import numeric_backend, symbolic_solver
+    digest = hashlib.sha256()
+    for path in (symbolic_solver.__file__, numeric_backend.__file__, __file__):
+        digest.update(Path(path).read_bytes())
+    return digest.hexdigest()
+
+
+def load_plans(domains: List[str], physics_db: Dict[str, Any]) -> Optional[Dict[tuple, Dict[str, Any]]]:
+    """Generated plans for `domains`, or None if there is no module or it was built from other data."""
+    name = module_name()
+    if name is None:
+        return None
+    if name not in _modules:
+        try:
+            _modules[name] = importlib.import_module(name)
+        except ImportError:
+            _modules[name] = None
+    module = _modules[name]
+    if module is None or list(module.DOMAINS) != list(domains):
+        return None
+    if module.KEY != plans_key(domains, physics_db):
+        logging.warning(f"Ignoring {name}: generated from other physics data or solver code; "
+                        f"rerun generate_solver_module")
+        return None
+    return module.PLANS
+
+
+def clear():
+    """Forget imported plan modules, e.g. after regenerating one."""
+    _modules.clear()
+
+
+def warm_up(solver, workflow: bool = True) -> int:
+    """Compile the common solve directions on `solver`; returns the number of plans compiled.
+
+    Each equation is solved for every variable from the others. With `workflow`, a
+    HydraulicCylinderWorkflow is also run in each mode, which compiles its signatures on
+    the shared solver (`solver` should then be the registry's solver for its domains).
+    """
+    for name in list(solver.equations):
+        variables = solver.equation_variables(name)
+        for target in variables:
+            known = {var: None for var in variables if var != target}
+            try:
+                solver._get_plan(name, known, target)
+            except Exception as e:
+                logging.info(f"No plan for {name} -> {target}: {e}")
+    if workflow:
+        from zylo.core.physics.conversions import ureg
+        from zylo.core.workflow.hydraulic_cylinder_workflow import HydraulicCylinderWorkflow
+        from zylo.core.workflow.uncertainty import Normal
+        for fast_units in (False, True):
+            cylinder = HydraulicCylinderWorkflow(1000 * ureg.kilonewton, 300 * ureg.bar, 1 * ureg.meter, 'S355', 2.0,
+                                                 fast_units=fast_units)
+            cylinder.run()
+            cylinder.sensitivities()
+        cylinder.run_uncertainty({'pressure': Normal(cov=0.05)}, samples=10)
+    return sum(plan is not None for plan in solver._plans.values())
+
+
+def _identifier(name: str, taken: set) -> str:
+    """A Python identifier for `name` that is unique in `taken`."""
+    base = re.sub(r'\W', '_', name)
+    if not base or base[0].isdigit() or keyword.iskeyword(base):
+        base = f'_{base}'
+    candidate, n = base, 1
+    while candidate in taken:
+        n += 1
+        candidate = f'{base}_{n}'
+    taken.add(candidate)
+    return candidate
+
+
+def _function(name: str, symbols: Dict[str, Any], inputs: List[str], expression, printer, target: str = None) -> str:
+    import sympy as sp
+    taken = set()
+    args = [_identifier(var, taken) for var in ([target] if target else []) + list(inputs)]
+    names = [target] + list(inputs) if target else list(inputs)
+    expression = expression.xreplace({symbols[var]: sp.Symbol(arg) for var, arg in zip(names, args)})
+    replacements, (reduced,) = sp.cse(expression, symbols=sp.numbered_symbols('_cse'))
+    lines = [f"def {name}({', '.join(args)}):"]
+    lines += [f"    {sym} = {printer.doprint(value)}" for sym, value in replacements]
+    lines.append(f"    return {printer.doprint(reduced)}")
+    return '\n'.join(lines)
+
+
+def render(solver, domains: List[str], key: str) -> str:
+    """Source of the plan module for the compiled plans on `solver`."""
+    from sympy.printing.numpy import NumPyPrinter
+    from sympy.printing.pycode import PythonCodePrinter
+    numpy_printer, math_printer = NumPyPrinter(), PythonCodePrinter()
+    functions, entries, taken = [], [], set()
+
+    def function_name(*parts) -> str:
+        return _identifier('__'.join(parts), taken)
+
+    for plan_key, plan in sorted(solver._plans.items(), key=lambda item: repr(item[0])):
+        if plan is None:
+            continue
+        known = f"frozenset({tuple(sorted(plan_key[1]))!r})"
+        inputs = plan['inputs']
+        if 'solutions' in plan:
+            equation_names, _, targets = plan_key
+            solutions, expressions = [], []
+            for branch, solution in enumerate(plan['expressions']):
+                kernels = {}
+                for target, expression in solution.items():
+                    name = function_name('_'.join(equation_names), target, f'b{branch}', '_'.join(inputs))
+                    functions.append(_function(name, solver.symbols, inputs, expression, numpy_printer))
+                    kernels[target] = name
+                solutions.append('{' + ', '.join(f'{t!r}: {k}' for t, k in kernels.items()) + '}')
+                expressions.append({target: str(expression) for target, expression in solution.items()})
+            entries.append(f"    ({equation_names!r}, {known}, {targets!r}): {{\n"
+                           f"        'inputs': {inputs!r},\n"
+                           f"        'solutions': [{', '.join(solutions)}],\n"
+                           f"        'expressions': {expressions!r},\n"
+                           f"    }},")
+            continue
+        equation_name, _, solve_for, backend = plan_key
+        name = function_name(equation_name, solve_for, '_'.join(inputs))
+        if 'residual' in plan:
+            functions.append(_function(name, solver.symbols, inputs, plan['expression'], math_printer, solve_for))
+            kind = 'residual'
+        else:
+            functions.append(_function(name, solver.symbols, inputs, plan['expression'], numpy_printer))
+            kind = 'kernel'
+        entries.append(f"    ({equation_name!r}, {known}, {solve_for!r}, {backend!r}): {{\n"
+                       f"        'inputs': {inputs!r},\n"
+                       f"        {kind!r}: {name},\n"
+                       f"        'expression': {str(plan['expression'])!r},\n"
+                       f"    }},")
+    header = '\n'.join([
+        '"""Solve plans generated by `manage.py generate_solver_module`; do not edit."""',
+        'import math',
+        '',
+        'import numpy',
+        '',
+        f'DOMAINS = {list(domains)!r}',
+        f'KEY = {key!r}',
+    ])
+    plans = '\n'.join([
+        '# (equation, known symbols, target, backend) or (equations, known symbols, targets) -> plan',
+        'PLANS = {',
+        *entries,
+        '}',
+    ])
+    return '\n\n\n'.join([header, *functions, plans]) + '\n'
+
+
+def generate(domains: List[str], path: Path = DEFAULT_PATH, workflow: bool = True) -> int:
+    """Compile the common solve directions for `domains` and write them to `path`; returns the plan count."""
+    from zylo.core.data import db_source
+    from zylo.core.data.physics_db import PHYSICS_DB
+    from zylo.core.math import solver_registry
+    # Plans must be compiled symbolically, not taken from an existing module
+    previous = os.environ.get('ZYLO_GENERATED_PLANS')
+    os.environ['ZYLO_GENERATED_PLANS'] = '0'
+    try:
+        solver_registry.clear()
+        solver = solver_registry.get_solver(domains)
+        count = warm_up(solver, workflow=workflow)
+    finally:
+        if previous is None:
+            del os.environ['ZYLO_GENERATED_PLANS']
+        else:
+            os.environ['ZYLO_GENERATED_PLANS'] = previous
+        solver_registry.clear()
+    physics_db = db_source.load_physics_db(domains) or PHYSICS_DB
+    source = render(solver, domains, plans_key(domains, physics_db))
+    path = Path(path)
+    tmp = path.with_suffix('.tmp')
+    tmp.write_text(source)
+    tmp.replace(path)
+    clear()
+    return count
@@ -0,0 +1,64 @@
+"""
+Numeric root finding for equations sp.solve handles slowly.
+
+Equations with fractional powers of the unknown (e.g. `f = 0.316 / Re**0.25`
+chained through `reynolds`) can send sp.solve down slow paths. For those the
+solver compiles the residual `lhs - rhs` once and solves it with scipy. Brackets
+come from the positivity assumptions on the symbols: a logarithmic scan over
+positive values finds a sign change for brentq, with newton and fsolve as
+fallbacks when no bracket exists.
+"""
+import math
+
+import numpy as np
+import sympy as sp
+
+# Logarithmic scan covering every magnitude engineering quantities take in SI units
+POSITIVE_SCAN = np.logspace(-12, 12, 97)
+SIGNED_SCAN = np.concatenate((-POSITIVE_SCAN[::-1], [0.0], POSITIVE_SCAN))
+RESIDUAL_TOLERANCE = 1e-9
+
+
+def prefers_numeric(equation: sp.Eq, target: sp.Symbol) -> bool:
+    """True if the target sits under a fractional power other than a square root."""
+    for power in equation.atoms(sp.Pow):
+        exponent = power.exp
+        if exponent.is_number and not exponent.is_integer and target in power.base.free_symbols:
+            if not (exponent.is_Rational and exponent.q == 2):
+                return True
+    return False
+
+
+def find_root(residual, args, positive: bool = True) -> float:
+    """Root of `residual(x, *args)`; raises ValueError if none is found."""
+    # scipy.optimize takes longer to import than the rest of the solver; only numeric solves need it
+    from scipy.optimize import brentq, fsolve, newton
+
+    def f(x):
+        try:
+            value = residual(x, *args)
+        except (ValueError, ZeroDivisionError, OverflowError):
+            return math.nan
+        return float(value) if isinstance(value, (int, float)) else math.nan
+
+    scan = POSITIVE_SCAN if positive else SIGNED_SCAN
+    values = [f(x) for x in scan]
+    for a, b, fa, fb in zip(scan, scan[1:], values, values[1:]):
+        if fa == 0:
+            return float(a)
+        if math.isfinite(fa) and math.isfinite(fb) and fa * fb < 0:
+            return brentq(f, a, b, xtol=1e-300)
+
+    finite = [(abs(value), x) for x, value in zip(scan, values) if math.isfinite(value)]
+    if finite:
+        guess = min(finite)[1]
+        candidates = []
+        try:
+            candidates.append(newton(f, guess))
+        except (RuntimeError, ArithmeticError):
+            pass
+        candidates.append(fsolve(lambda x: f(x[0]), [guess])[0])
+        for x in candidates:
+            if math.isfinite(x) and (x > 0 or not positive) and abs(f(x)) <= RESIDUAL_TOLERANCE * max(1.0, abs(f(guess))):
+                return float(x)
+    raise ValueError("No numeric root found")
@@ -0,0 +1,117 @@
+"""
+In-process memoization of solve and workflow results.
+
+Repeated specifications (same force/pressure/stroke/material from templates)
+return the stored result instead of running the solver again. Keys are
+normalized inputs: SI magnitudes, material names and safety factors, so
+`300 bar` and `30 MPa` share an entry.
+
+Both caches are bounded LRUs with an optional TTL, configured by
+ZYLO_RESULT_CACHE_SIZE (entries per cache, 0 disables) and
+ZYLO_RESULT_CACHE_TTL (seconds). Call `invalidate()` after changing
+MATERIALS_DB or PHYSICS_DB.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable
+
+from zylo.core import metrics
+from zylo.core.math import solver_registry
+
+_MISSING = object()
+
+
+class LRUCache:
+    """Thread-safe bounded LRU mapping with optional per-entry time to live."""
+
+    def __init__(self, name: str, maxsize: int = 1024, ttl: float = None):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+
+    def get(self, key: Hashable, default=_MISSING):
+        """Stored value for `key`, or `default` (counted as a miss)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (entry[1] is None or entry[1] > time.monotonic()):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                metrics.count(f'{self.name}_cache_hit')
+                return entry[0]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+        metrics.count(f'{self.name}_cache_miss')
+        return default
+
+    def put(self, key: Hashable, value):
+        if self.maxsize <= 0:
+            return
+        expires = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._entries[key] = (value, expires)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+            }
+
+
+_size = int(os.environ.get('ZYLO_RESULT_CACHE_SIZE', '1024'))
+_ttl = float(os.environ.get('ZYLO_RESULT_CACHE_TTL', '0')) or None
+
+SOLVE_CACHE = LRUCache('solve', _size, _ttl)
+WORKFLOW_CACHE = LRUCache('workflow', _size, _ttl)
+
+
+def normalize(value):
+    """Hashable key component for a scalar input, or None if it cannot be keyed (e.g. arrays)."""
+    if isinstance(value, (str, int, float)):
+        return value
+    if getattr(value, 'ndim', 0):
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def stats() -> Dict[str, Dict[str, Any]]:
+    """Hit-rate statistics of every result cache."""
+    return {cache.name: cache.stats() for cache in (SOLVE_CACHE, WORKFLOW_CACHE)}
+
+
+def invalidate(reload_solvers: bool = True):
+    """Drop all memoized results; call after editing MATERIALS_DB or PHYSICS_DB.
+
+    With `reload_solvers` the shared solver snapshots are dropped too, so the next
+    calculator reloads equations and rules from PHYSICS_DB.
+    """
+    SOLVE_CACHE.clear()
+    WORKFLOW_CACHE.clear()
+    from zylo.core.data import materials_db, materials_table
+    materials_db.clear()
+    materials_table.clear()
+    if reload_solvers:
+        solver_registry.clear()
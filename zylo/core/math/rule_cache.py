@@ -0,0 +1,167 @@
+"""
+On-disk cache of parsed equations and detected substitution rules.
+
+Parsing PHYSICS_DB and running the substitution detector calls sympy for every
+symbol of every equation. The result only depends on the database content and
+the detector and solver code, so it is stored once per content hash and reused
+on later starts. Any change to `physics_db.py`, the detector or symbolic_solver.py
+yields a new hash and the cache is rebuilt automatically.
+
+Files are JSON. Expressions are stored as trees over a fixed set of sympy node
+types and rebuilt without eval, so a cache file can at worst fail to load; it can
+never run code. The cache directory is created private to the user.
+"""
+import functools
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import sympy as sp
+
+from zylo.core.data.physics_db import PHYSICS_DB
+from zylo.core.math import auto_substitution_detector
+
+CACHE_VERSION = 3
+CACHE_DIR = Path(os.environ.get('ZYLO_CACHE_DIR', Path.home() / '.cache' / 'zylo'))
+CACHE_ENABLED = os.environ.get('ZYLO_RULE_CACHE', '1') != '0'
+
+# Node types a stored expression may contain; anything else is not cached
+_NODES = {cls.__name__: cls for cls in (
+    sp.Add, sp.Mul, sp.Pow, sp.Eq, sp.exp, sp.log, sp.sin, sp.cos, sp.tan, sp.asin, sp.acos, sp.atan,
+    sp.sinh, sp.cosh, sp.tanh, sp.Abs, sp.sign, sp.Min, sp.Max)}
+_CONSTANTS = {'Pi', 'Exp1', 'ImaginaryUnit', 'Infinity', 'NegativeInfinity', 'ComplexInfinity', 'NaN',
+              'EulerGamma', 'GoldenRatio', 'BooleanTrue', 'BooleanFalse'}
+
+
+def cache_key(domains: List[str], physics_db: Dict[str, Any] = None) -> str:
+    """Content hash of everything the derived rules depend on."""
+    physics_db = physics_db or PHYSICS_DB
+    digest = hashlib.sha256()
+    digest.update(f'v{CACHE_VERSION}|sympy{sp.__version__}|'.encode())
+    domain_data = [(name, physics_db['domains'][name]) for name in domains]
+    digest.update(json.dumps(domain_data, sort_keys=True, default=str).encode())
+    digest.update(_code_digest().encode())
+    return digest.hexdigest()
+
+
+@functools.lru_cache(maxsize=None)
+def _code_digest() -> str:
+    """Hash of the detector and of the solver's parsing, symbol assumptions and rule ordering."""
+    digest = hashlib.sha256()
+    for path in (auto_substitution_detector.__file__, Path(__file__).with_name('symbolic_solver.py')):
+        digest.update(Path(path).read_bytes())
+    return digest.hexdigest()
+
+
+def cache_path(domains: List[str], physics_db: Dict[str, Any] = None) -> Path:
+    return CACHE_DIR / f"rules-{'-'.join(domains)}-{cache_key(domains, physics_db)[:16]}.json"
+
+
+def load_rules(domains: List[str], physics_db: Dict[str, Any] = None) -> Optional[Dict[str, Any]]:
+    """Return the cached payload for `domains`, or None if missing or unreadable."""
+    if not CACHE_ENABLED:
+        return None
+    key = cache_key(domains, physics_db)
+    path = cache_path(domains, physics_db)
+    try:
+        payload = loads(path.read_text())
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logging.warning(f"Ignoring unreadable rule cache {path}: {e}")
+        return None
+    if payload.get('key') != key:
+        return None
+    return payload
+
+
+def make_payload(key: str, equations: Dict[str, sp.Eq], substitution_rules: Dict[str, List[dict]],
+                 equation_metadata: Dict[str, dict]) -> Dict[str, Any]:
+    return {
+        'key': key,
+        'equations': equations,
+        'substitution_rules': substitution_rules,
+        'equation_metadata': equation_metadata,
+    }
+
+
+def _encode(expr, symbols: Dict[str, dict]):
+    if expr.is_Symbol:
+        symbols.setdefault(expr.name, expr.assumptions0)
+        return ['Symbol', expr.name]
+    if expr.is_Integer:
+        return ['Integer', int(expr)]
+    if expr.is_Rational:
+        return ['Rational', int(expr.p), int(expr.q)]
+    if expr.is_Float:
+        return ['Float', list(expr._mpf_), expr._prec]
+    name = type(expr).__name__
+    if name in _CONSTANTS:
+        return [name]
+    if name not in _NODES:
+        raise ValueError(f"Cannot store {name} expressions")
+    return [name] + [_encode(arg, symbols) for arg in expr.args]
+
+
+def _decode(node, symbols: Dict[str, sp.Symbol]):
+    name = node[0]
+    if name == 'Symbol':
+        return symbols[node[1]]
+    if name == 'Integer':
+        return sp.Integer(int(node[1]))
+    if name == 'Rational':
+        return sp.Rational(int(node[1]), int(node[2]))
+    if name == 'Float':
+        return sp.Float(tuple(int(part) for part in node[1]), precision=int(node[2]))
+    if name in _CONSTANTS:
+        return getattr(sp.S, name)
+    return _NODES[name](*(_decode(arg, symbols) for arg in node[1:]), evaluate=False)
+
+
+def dumps(payload: Dict[str, Any]) -> str:
+    """JSON text of a `make_payload` dict; raises ValueError for expressions that cannot be stored."""
+    symbols = {}
+    equations = {name: _encode(equation, symbols) for name, equation in payload['equations'].items()}
+    rules = {target: [{'sources': list(rule['sources']), 'expression': _encode(rule['expression'], symbols),
+                       'priority': rule['priority'], 'equation': rule.get('equation')} for rule in target_rules]
+             for target, target_rules in payload['substitution_rules'].items()}
+    return json.dumps({'key': payload['key'], 'symbols': symbols, 'equations': equations,
+                       'substitution_rules': rules, 'equation_metadata': dict(payload['equation_metadata'])})
+
+
+def loads(text: str) -> Dict[str, Any]:
+    """Payload dict from `dumps` text."""
+    data = json.loads(text)
+    symbols = {name: sp.Symbol(name, **{k: bool(v) for k, v in assumptions.items()})
+               for name, assumptions in data['symbols'].items()}
+    equations = {name: _decode(tree, symbols) for name, tree in data['equations'].items()}
+    rules = {target: [{'sources': [str(source) for source in rule['sources']],
+                       'expression': _decode(rule['expression'], symbols),
+                       'priority': int(rule['priority']), 'equation': rule['equation']} for rule in target_rules]
+             for target, target_rules in data['substitution_rules'].items()}
+    return make_payload(data['key'], equations, rules, data['equation_metadata'])
+
+
+def store_rules(domains: List[str], equations: Dict[str, sp.Eq], substitution_rules: Dict[str, List[dict]],
+                equation_metadata: Dict[str, dict], physics_db: Dict[str, Any] = None):
+    """Atomically write the derived equations and rules for `domains`."""
+    if not CACHE_ENABLED:
+        return
+    path = cache_path(domains, physics_db)
+    payload = make_payload(cache_key(domains, physics_db), equations, substitution_rules, equation_metadata)
+    tmp_name = None
+    try:
+        text = dumps(payload)
+        path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+        with os.fdopen(fd, 'w') as fh:
+            fh.write(text)
+        os.replace(tmp_name, path)
+    except Exception as e:
+        logging.warning(f"Could not write rule cache {path}: {e}")
+        if tmp_name and os.path.exists(tmp_name):
+            os.unlink(tmp_name)
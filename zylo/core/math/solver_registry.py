@@ -0,0 +1,46 @@
+"""
+Process-wide registry of loaded, frozen SymbolicSolver snapshots.
+
+Loading a solver parses equations and derives substitution rules, so calculators
+share one read-only snapshot per domain list instead of building their own.
+Lazy solvers parse equations on first use and therefore stay mutable.
+"""
+import threading
+from typing import TYPE_CHECKING, Dict, List, Tuple
+
+from zylo.core import metrics
+
+if TYPE_CHECKING:
+    from zylo.core.math.symbolic_solver import SymbolicSolver
+
+_solvers: Dict[Tuple[Tuple[str, ...], bool], 'SymbolicSolver'] = {}
+_lock = threading.Lock()
+
+
+def get_solver(domains: List[str], lazy: bool = False) -> 'SymbolicSolver':
+    """Return the shared solver for `domains`, loading it on first use.
+
+    Eager solvers are frozen; `lazy=True` returns a solver that parses equations on demand.
+    """
+    key = (tuple(domains), lazy)
+    solver = _solvers.get(key)
+    if solver is None:
+        metrics.count('solver_registry_miss')
+        with _lock:
+            solver = _solvers.get(key)
+            if solver is None:
+                # Deferred so importing calculators does not import sympy
+                from zylo.core.math.symbolic_solver import SymbolicSolver
+                solver = SymbolicSolver()
+                with metrics.timed('load_from_database'):
+                    solver.load_from_database(list(key[0]), lazy=lazy)
+                if not lazy:
+                    solver.freeze()
+                _solvers[key] = solver
+    return solver
+
+
+def clear():
+    """Drop all snapshots so the next `get_solver` call reloads from the database."""
+    with _lock:
+        _solvers.clear()
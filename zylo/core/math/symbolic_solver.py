@@ -1,57 +1,368 @@
 import sympy as sp
+import bisect
+import functools
 import logging
-from typing import Dict, Any, List
-from zylo.core.physics.conversions import ureg
+import math
+import re
+import threading
+import numpy as np
+from types import MappingProxyType
+from collections import deque
+from typing import Dict, Any, List, Tuple
+import pint
+from zylo.core.physics.conversions import ureg, si_conversion
 from zylo.core.data.physics_db import PHYSICS_DB
 from zylo.core.math.auto_substitution_detector import AutoSubstitutionDetector
+from zylo.core.math import codegen, numeric_backend, rule_cache
+from zylo.core.data import db_source
+from zylo.core import metrics
+
+
+def _locked(method):
+    """Run `method` holding the solver's lock."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
 
 class SymbolicSolver:
-    """Enhanced solver with automatic substitution detection."""
+    """Enhanced solver with automatic substitution detection.
+
+    Safe to share between threads. Mutations, lazy parsing and symbolic work (plan
+    compilation, the sympy fallback solve) hold `_lock`. Solves with an already compiled
+    plan take no lock. Rule lists and the rule index are replaced on change rather than
+    edited in place, so readers always see a consistent snapshot.
+    """
     
     def __init__(self):
         self.symbols = {}
         self.equations = {}
         self.substitution_rules = {}
         self.unit_map = {}
+        # Per-symbol (SI scale factor, dimensionality) of the declared unit
+        self.unit_info = {}
         self.auto_detector = None
-    
+        self.frozen = False
+        # Compiled solve plans keyed by (equation, known-set, target); not part of the frozen state
+        self._plans = {}
+        self._targets = {}
+        self._variables = {}
+        # Symbols each plan / target selection was derived through; used for selective invalidation
+        self._plan_deps = {}
+        self._target_deps = {}
+        self._rule_graph = None
+        # Load order of equations; breaks priority ties between rules of different equations
+        self._equation_order = {}
+        # Lazy mode: unparsed equations {name: (expression, metadata)} and the symbols they can yield rules for
+        self._pending = {}
+        self._pending_by_symbol = {}
+        self._resolved = set()
+        self._lock = threading.RLock()
+        # Ahead-of-time compiled plans (see codegen), valid while the loaded data is unmodified
+        self._generated = None
+
+    @_locked
+    def freeze(self):
+        """Make the symbol table, equations and rules read-only so the solver can be shared."""
+        if self._pending:
+            raise RuntimeError("Cannot freeze a lazily loaded solver with unparsed equations")
+        self.symbols = MappingProxyType(dict(self.symbols))
+        self.equations = MappingProxyType(dict(self.equations))
+        self.unit_map = MappingProxyType(dict(self.unit_map))
+        self.unit_info = MappingProxyType(dict(self.unit_info))
+        self.substitution_rules = MappingProxyType({
+            target: tuple(MappingProxyType({**rule, 'sources': tuple(rule['sources'])}) for rule in rules)
+            for target, rules in self.substitution_rules.items()
+        })
+        if self.auto_detector is not None:
+            self.auto_detector.equation_metadata = MappingProxyType(dict(self.auto_detector.equation_metadata))
+        self.frozen = True
+        return self
+
+    @_locked
+    def copy(self) -> 'SymbolicSolver':
+        """Return a mutable copy, e.g. to extend a shared frozen solver."""
+        clone = SymbolicSolver()
+        clone.symbols = dict(self.symbols)
+        clone.equations = dict(self.equations)
+        clone.unit_map = dict(self.unit_map)
+        clone.unit_info = dict(self.unit_info)
+        clone.substitution_rules = {target: [dict(rule, sources=list(rule['sources'])) for rule in rules]
+                                    for target, rules in self.substitution_rules.items()}
+        clone.auto_detector = AutoSubstitutionDetector(clone)
+        if self.auto_detector is not None:
+            clone.auto_detector.equation_metadata = dict(self.auto_detector.equation_metadata)
+        clone._equation_order = dict(self._equation_order)
+        clone._pending = dict(self._pending)
+        clone._pending_by_symbol = {symbol: set(names) for symbol, names in self._pending_by_symbol.items()}
+        clone._generated = self._generated
+        return clone
+
+    def _clear_plans(self):
+        self._plans.clear()
+        self._targets.clear()
+        self._variables.clear()
+        self._plan_deps.clear()
+        self._target_deps.clear()
+        self._rule_graph = None
+
+    def _dependencies(self, variables) -> frozenset:
+        """Symbols calculable from `variables`: a plan built from them depends on their rules."""
+        return frozenset(variables) | {target for target, _ in self.derivation_chain(variables)}
+
+    def _invalidate_rule(self, target: str, sources):
+        """Drop plans and target selections a changed rule for `target` can affect.
+
+        Affected are those that derived `target` (its rule choice may change) and those
+        whose calculable symbols cover `sources` (the rule may now fire for them). Keys
+        that have `target` among their known inputs never consult its rules and are kept.
+        """
+        sources = set(sources)
+        for store, deps in ((self._plans, self._plan_deps), (self._targets, self._target_deps)):
+            stale = [key for key, symbols in list(deps.items())
+                     if target not in key[1] and (target in symbols or sources <= symbols)]
+            for key in stale:
+                store.pop(key, None)
+                del deps[key]
+            metrics.count('plan_invalidated', len(stale))
+
+    def _invalidate_equation(self, name: str):
+        """Drop plans and cached variables of one equation."""
+        self._variables.pop(name, None)
+        for store, deps in ((self._plans, self._plan_deps), (self._targets, self._target_deps)):
+            stale = [key for key in list(store) if key[0] == name or (isinstance(key[0], tuple) and name in key[0])]
+            for key in stale:
+                store.pop(key, None)
+                deps.pop(key, None)
+
+    def _check_mutable(self):
+        if self.frozen:
+            raise RuntimeError("SymbolicSolver is frozen; use copy() to get a mutable solver")
+        # Every mutation goes through here; generated plans no longer match the solver after one
+        self._generated = None
+
+    @_locked
     def add_symbols(self, symbol_definitions: Dict[str, Dict[str, Any]]):
+        self._check_mutable()
         for name, definition in symbol_definitions.items():
             properties = definition.get('properties', {'real': True, 'positive': True})
             self.symbols[name] = sp.Symbol(name, **properties)
             self.unit_map[name] = definition.get('units', ureg.dimensionless)
+            self.unit_info[name] = si_conversion(getattr(self.unit_map[name], 'units', self.unit_map[name]))
     
+    @_locked
     def add_equation(self, name: str, equation: sp.Eq):
+        self._check_mutable()
         if equation is not None:
             self.equations[name] = equation
+            self._equation_order.setdefault(name, len(self._equation_order))
+            self._invalidate_equation(name)
     
-    def add_substitution_rule(self, target: str, sources: List[str], expression: sp.Expr, priority: int = 0):
-        self.substitution_rules.setdefault(target, []).append({
-            'sources': sources,
-            'expression': expression,
-            'priority': priority
-        })
-        self.substitution_rules[target].sort(key=lambda x: x['priority'], reverse=True)
+    @_locked
+    def add_substitution_rule(self, target: str, sources: List[str], expression: sp.Expr, priority: int = 0,
+                              equation: str = None):
+        """Add a rule computing `target` from `sources`; `equation` names the equation it was derived from."""
+        self._check_mutable()
+        rule = {'sources': sources, 'expression': expression, 'priority': priority, 'equation': equation}
+        # Kept in priority order by insertion; equal priorities keep equation load order,
+        # however late an equation was parsed
+        rules = list(self.substitution_rules.get(target, ()))
+        bisect.insort(rules, rule, key=self._rule_sort_key)
+        # Copy on write: lock-free readers may hold the previous list
+        self.substitution_rules[target] = rules
+        self._reindex_target(target)
+        self._invalidate_rule(target, sources)
+
+    def _rule_sort_key(self, rule):
+        return -rule['priority'], self._equation_order.get(rule.get('equation'), math.inf)
+
+    @_locked
+    def add_equation_incremental(self, name: str, expression, metadata: Dict[str, Any] = None):
+        """Add (or replace) one equation and detect only its substitution rules.
+
+        `expression` is an sp.Eq or a string such as 'F = P * A' over known symbols;
+        `metadata` takes the PHYSICS_DB keys (output, inputs, bidirectional). Plans of this
+        equation and plans that derive or could newly derive a target of its rules are
+        invalidated (see _invalidate_rule); all others are kept.
+        """
+        self._check_mutable()
+        equation = self._parse_equation_string(expression) if isinstance(expression, str) else expression
+        if equation is None:
+            raise ValueError(f"Could not parse equation '{name}': {expression}")
+        unknown = [str(sym) for sym in equation.free_symbols if str(sym) not in self.symbols]
+        if unknown:
+            raise ValueError(f"Equation '{name}' uses undefined symbols {unknown}; add them with add_symbols()")
+        if name in self.equations or name in self._pending:
+            self.remove_equation(name)
+        if self.auto_detector is None:
+            self.auto_detector = AutoSubstitutionDetector(self)
+        self.add_equation(name, equation)
+        if metadata:
+            self.auto_detector.equation_metadata[name] = dict(metadata)
+        self.auto_detector.detect_equation(name)
+
+    @_locked
+    def remove_equation(self, name: str):
+        """Remove one equation and the substitution rules derived from it."""
+        self._check_mutable()
+        if name not in self.equations and name not in self._pending:
+            raise KeyError(name)
+        self.equations.pop(name, None)
+        pending = self._pending.pop(name, None)
+        if pending is not None:
+            for symbol in self._rule_targets(*pending):
+                self._pending_by_symbol[symbol].discard(name)
+        if self.auto_detector is not None:
+            self.auto_detector.equation_metadata.pop(name, None)
+        self._invalidate_equation(name)
+        for target in list(self.substitution_rules):
+            rules = self.substitution_rules[target]
+            removed = [rule for rule in rules if rule.get('equation') == name]
+            if not removed:
+                continue
+            rules = [rule for rule in rules if rule.get('equation') != name]
+            if rules:
+                self.substitution_rules[target] = rules
+            else:
+                del self.substitution_rules[target]
+            self._reindex_target(target)
+            for rule in removed:
+                self._invalidate_rule(target, rule['sources'])
     
-    def load_from_database(self, domains: List[str] = None):
+    @_locked
+    def load_from_database(self, domains: List[str] = None, use_cache: bool = True, physics_db: Dict[str, Any] = None,
+                           lazy: bool = False):
+        """Load symbols, equations and substitution rules for `domains`.
+
+        Data comes from `physics_db` if given, else from the Django models when the core
+        app is set up and populated (with rules stored in RuleSet), else from PHYSICS_DB
+        (with rules cached on disk).
+
+        With `lazy=True` only the symbols are loaded; each equation is parsed and its rules
+        detected the first time a solve needs it (see `_require`).
+        """
+        rule_store = rule_cache
+        if physics_db is None:
+            physics_db = db_source.load_physics_db(domains)
+            rule_store = db_source if physics_db is not None else rule_cache
+            physics_db = physics_db or PHYSICS_DB
         if domains is None:
-            domains = list(PHYSICS_DB['domains'].keys())
+            domains = list(physics_db['domains'].keys())
         for domain_name in domains:
-            domain = PHYSICS_DB['domains'][domain_name]
+            domain = physics_db['domains'][domain_name]
             self.add_symbols(self._convert_db_symbols(domain['symbols']))
+        if lazy:
+            self._defer_equations(physics_db, domains)
+            return
+        # Derived rules and generated plans only apply when nothing else was loaded before
+        fresh = not self.equations and not self.substitution_rules
+        cacheable = use_cache and fresh
+        if cacheable and self._load_cached_rules(rule_store.load_rules(domains, physics_db)):
+            metrics.count('rule_cache_hit')
+        else:
+            if cacheable:
+                metrics.count('rule_cache_miss')
+            self._load_equations(physics_db, domains, rule_store if cacheable else None)
+        if fresh:
+            self._generated = codegen.load_plans(domains, physics_db)
+
+    def _load_equations(self, physics_db: Dict[str, Any], domains: List[str], rule_store=None):
+        """Parse the equations of `domains`, detect substitution rules and store them in `rule_store`."""
         for domain_name in domains:
-            domain = PHYSICS_DB['domains'][domain_name]
+            domain = physics_db['domains'][domain_name]
             for eq_name, eq_data in domain['equations'].items():
                 eq_str = eq_data if isinstance(eq_data, str) else eq_data['expression']
                 self.add_equation(eq_name, self._parse_equation_string(eq_str))
         self.auto_detector = AutoSubstitutionDetector(self)
         for domain_name in domains:
-            domain = PHYSICS_DB['domains'][domain_name]
+            domain = physics_db['domains'][domain_name]
             for eq_name, eq_data in domain['equations'].items():
                 if isinstance(eq_data, dict):
                     self.auto_detector.equation_metadata[eq_name] = {k: v for k, v in eq_data.items() if k != 'expression'}
-        self.auto_detector.detect_substitutions()
-    
+        with metrics.timed('detect_substitutions'):
+            self.auto_detector.detect_substitutions()
+        if rule_store is not None:
+            rule_store.store_rules(domains, self.equations, self.substitution_rules,
+                                   self.auto_detector.equation_metadata, physics_db)
+
+    def _load_cached_rules(self, payload) -> bool:
+        if payload is None:
+            return False
+        for name in payload['equations']:
+            self._equation_order.setdefault(name, len(self._equation_order))
+        self.equations.update(payload['equations'])
+        self.substitution_rules.update(payload['substitution_rules'])
+        self.auto_detector = AutoSubstitutionDetector(self)
+        self.auto_detector.equation_metadata.update(payload['equation_metadata'])
+        return True
+
+    def _defer_equations(self, physics_db: Dict[str, Any], domains: List[str]):
+        """Record equations for lazy parsing, indexed by the symbols they can yield rules for."""
+        if self.auto_detector is None:
+            self.auto_detector = AutoSubstitutionDetector(self)
+        for domain_name in domains:
+            for eq_name, eq_data in physics_db['domains'][domain_name]['equations'].items():
+                eq_str = eq_data if isinstance(eq_data, str) else eq_data['expression']
+                metadata = {k: v for k, v in eq_data.items() if k != 'expression'} if isinstance(eq_data, dict) else None
+                self._equation_order.setdefault(eq_name, len(self._equation_order))
+                self._pending[eq_name] = (eq_str, metadata)
+                for symbol in self._rule_targets(eq_str, metadata):
+                    self._pending_by_symbol.setdefault(symbol, set()).add(eq_name)
+        self._resolved.clear()
+
+    def _equation_symbols(self, eq_str: str) -> List[str]:
+        return [name for name in dict.fromkeys(re.findall(r'[A-Za-z_]\w*', eq_str)) if name in self.symbols]
+
+    def _rule_targets(self, eq_str: str, metadata: Dict[str, Any]) -> Dict[str, List[str]]:
+        """{target: sources} of the rules detection may derive from an unparsed equation."""
+        names = self._equation_symbols(eq_str)
+        if metadata and not metadata.get('bidirectional') and 'output' in metadata and 'inputs' in metadata:
+            return {metadata['output']: list(metadata['inputs'])}
+        return {name: [other for other in names if other != name] for name in names}
+
+    def _require(self, equation_names):
+        """Parse the pending equations needed to solve `equation_names` and detect their rules.
+
+        Needed are the equations themselves and, transitively, every pending equation that can
+        yield a substitution rule for a needed symbol, so derivation chains match an eager load.
+        """
+        if not self._pending or self._resolved.issuperset(equation_names):
+            return
+        with self._lock, metrics.timed('lazy_load'):
+            frontier = []
+            selected = set()
+            for name in equation_names:
+                if name in self._pending:
+                    selected.add(name)
+                    frontier.extend(self._equation_symbols(self._pending[name][0]))
+                elif name in self.equations:
+                    frontier.extend(str(sym) for sym in self.equations[name].free_symbols)
+            needed = set()
+            while frontier:
+                symbol = frontier.pop()
+                if symbol in needed:
+                    continue
+                needed.add(symbol)
+                for rule in self.substitution_rules.get(symbol, ()):
+                    frontier.extend(rule['sources'])
+                for name in self._pending_by_symbol.get(symbol, ()):
+                    selected.add(name)
+                    frontier.extend(self._rule_targets(*self._pending[name])[symbol])
+            selected = sorted(selected, key=self._equation_order.get)
+            for name in selected:
+                eq_str, metadata = self._pending.pop(name)
+                for symbol in self._rule_targets(eq_str, metadata):
+                    self._pending_by_symbol[symbol].discard(name)
+                self.add_equation(name, self._parse_equation_string(eq_str))
+                if metadata is not None:
+                    self.auto_detector.equation_metadata[name] = metadata
+            for name in selected:
+                if name in self.equations:
+                    self.auto_detector.detect_equation(name)
+            self._resolved.update(equation_names)
+
     def _convert_db_symbols(self, db_symbols):
         return {name: {'units': self._parse_units(data['units']), 'properties': {'real': True, 'positive': True}}
                 for name, data in db_symbols.items()}
@@ -60,7 +371,8 @@ class SymbolicSolver:
         try:
             lhs_str, rhs_str = eq_string.split(' = ')
             namespace = {'pi': sp.pi, 'sp': sp, **self.symbols}
-            return sp.Eq(sp.sympify(lhs_str, locals=namespace), sp.sympify(rhs_str, locals=namespace))
+            with metrics.timed('parse_equation'):
+                return sp.Eq(sp.sympify(lhs_str, locals=namespace), sp.sympify(rhs_str, locals=namespace))
         except Exception as e:
             logging.error(f"Failed to parse equation: {eq_string} - {e}")
             return None
@@ -72,36 +384,450 @@ class SymbolicSolver:
             return ureg.dimensionless
     
     def _find_substitutions(self, equation_name: str, known: Dict[str, Any]) -> Dict[str, sp.Expr]:
-        equation = self.equations[equation_name]
-        equation_symbols = equation.free_symbols
-        possible_subs = {}
+        with metrics.timed('substitution_chain'):
+            return {target: rule['expression'] for target, rule in self.derivation_chain(known)}
+
+    def derivation_chain(self, known) -> List[Tuple[str, Any]]:
+        """Rules that make each derivable symbol calculable from `known`, in derivation order.
+
+        Forward chaining over the source index: each rule keeps a count of its sources that
+        are not yet calculable and fires when the count reaches zero, so every rule/source
+        pair is visited at most once.
+        """
+        by_source, sourceless, rules = self._rule_index()
         calculable = set(known)
-        
-        # Keep iterating until no new substitutions can be found
-        max_iterations = 20  # Prevent infinite loops
-        for iteration in range(max_iterations):
-            changed = False
-            
-            for target, rules in self.substitution_rules.items():
+        missing = {}
+        chain = []
+        queue = deque(calculable)
+        ready = dict(sourceless)
+        while True:
+            for target, position in ready.items():
+                if target not in calculable:
+                    calculable.add(target)
+                    chain.append((target, rules[target][position]))
+                    queue.append(target)
+            if not queue:
+                break
+            ready = {}
+            symbol = queue.popleft()
+            for target, entries in by_source.get(symbol, {}).items():
                 if target in calculable:
                     continue
-                
-                # Try each rule for this target
-                for rule in rules:
-                    if all(source in calculable for source in rule['sources']):
-                        possible_subs[target] = rule['expression']
-                        calculable.add(target)
-                        changed = True
+                for position, n_sources in entries:
+                    count = missing.get((target, position), n_sources) - 1
+                    missing[(target, position)] = count
+                    if count == 0:
+                        # Several rules completed by the same symbol: keep the highest priority one
+                        ready[target] = min(position, ready.get(target, position))
+        return chain
+
+    def _rule_index(self):
+        """Substitution rules indexed by source symbol, built lazily and updated per target.
+
+        Returns ({source: {target: [(position, n_sources)]}}, {target: position of its
+        first rule without sources}, {target: rules} the positions refer to). The index is
+        never changed once published, so concurrent readers can use it without the lock.
+        """
+        graph = self._rule_graph
+        if graph is None:
+            with self._lock:
+                graph = self._rule_graph
+                if graph is None:
+                    graph = ({}, {}, dict(self.substitution_rules))
+                    for target in graph[2]:
+                        self._index_target(graph, target)
+                    self._rule_graph = graph
+        return graph
+
+    def _index_target(self, graph, target: str):
+        by_source, sourceless, rules = graph
+        for position, rule in enumerate(rules.get(target, ())):
+            sources = set(rule['sources'])
+            if not sources:
+                sourceless.setdefault(target, position)
+            for source in sources:
+                by_source.setdefault(source, {}).setdefault(target, []).append((position, len(sources)))
+
+    def _reindex_target(self, target: str):
+        """Publish a new index with the entries of one target refreshed after its rule list changed."""
+        if self._rule_graph is None:
+            return
+        by_source, sourceless, rules = self._rule_graph
+        graph = ({source: {other: entries for other, entries in targets.items() if other != target}
+                  for source, targets in by_source.items()},
+                 {other: position for other, position in sourceless.items() if other != target},
+                 dict(rules))
+        if target in self.substitution_rules:
+            graph[2][target] = self.substitution_rules[target]
+        else:
+            graph[2].pop(target, None)
+        self._index_target(graph, target)
+        self._rule_graph = graph
+
+    def equation_variables(self, equation_name: str) -> List[str]:
+        """Names of the free symbols of an equation (cached)."""
+        variables = self._variables.get(equation_name)
+        if variables is None:
+            self._require((equation_name,))
+            variables = [str(sym) for sym in self.equations[equation_name].free_symbols]
+            self._variables.setdefault(equation_name, variables)
+        return variables
+
+    def solve_smart(self, equation_name: str, primary_vars: List[str], backend: str = 'auto', **kwargs):
+        """Solve an equation for its single undetermined variable.
+
+        `backend` is 'auto' (symbolic, numeric root finding for equations sympy handles
+        slowly), 'symbolic' or 'numeric'.
+        """
+        self._require((equation_name,))
+        known = {k: v for k, v in kwargs.items() if v is not None}
+        solve_for = self._target_for(equation_name, primary_vars, known)
+        result = self._solve(equation_name, known, solve_for, backend)
+        if solve_for in self.unit_map:
+            result = result * self.unit_map[solve_for]
+        return result
+
+    def solve_value(self, equation_name: str, primary_vars: List[str], backend: str = 'auto', **kwargs) -> float:
+        """Like solve_smart, but returns the SI magnitude as a plain float."""
+        self._require((equation_name,))
+        known = {k: v for k, v in kwargs.items() if v is not None}
+        return self._solve(equation_name, known, self._target_for(equation_name, primary_vars, known), backend)
+
+    def to_si(self, name: str, value):
+        """Strip units at the API boundary: check dimensions and scale to the SI magnitude.
+
+        Plain numbers are taken to be SI already, as in solve_smart.
+        """
+        if not isinstance(value, ureg.Quantity):
+            return value
+        with metrics.timed('unit_conversion'):
+            factor, dimensionality = si_conversion(value.units)
+            expected = self.unit_info.get(name)
+            if expected is not None and dimensionality != expected[1]:
+                raise pint.DimensionalityError(value.units, self.unit_map[name], dimensionality, expected[1])
+            if factor is None:
+                return value.to_base_units().magnitude
+            return value.magnitude * factor
+
+    def solve_system(self, equation_names: List[str], known: Dict[str, Any], targets: List[str]) -> Dict[str, Any]:
+        """Solve several equations together for several unknowns in one pass.
+
+        Unknowns that are not targets but derivable from `known` through substitution rules
+        are substituted first; the remaining unknowns must be determined by the equations.
+        The symbolic solution is compiled once per (equations, known-set, targets) structure,
+        so later calls with new numbers only evaluate it.
+        """
+        values = self.solve_system_values(equation_names, known, targets)
+        return {target: value * self.unit_map[target] if target in self.unit_map else value
+                for target, value in values.items()}
+
+    def solve_system_values(self, equation_names: List[str], known: Dict[str, Any], targets: List[str]) -> Dict[str, float]:
+        """Like solve_system, but returns SI magnitudes as plain floats."""
+        self._require(equation_names)
+        known = {k: v for k, v in known.items() if v is not None}
+        plan = self._get_system_plan(equation_names, known, targets)
+        inputs = [self._si_magnitude(known[var]) for var in plan['inputs']]
+        for kernels in plan['solutions']:
+            with np.errstate(invalid='ignore', divide='ignore'), metrics.timed('kernel_eval'):
+                values = {target: float(kernel(*inputs)) for target, kernel in kernels.items()}
+            if all(math.isfinite(value) and (value > 0 or not self.symbols[target].is_positive)
+                   for target, value in values.items()):
+                return values
+        raise ValueError(
+            f"No valid solution for {list(targets)} in equations {list(equation_names)}.\n"
+            f"Known inputs: {known}"
+        )
+
+    def _get_system_plan(self, equation_names: List[str], known: Dict[str, Any], targets: List[str]):
+        key = (tuple(equation_names), frozenset(var for var in known if var in self.symbols), tuple(targets))
+        plan = self._plans.get(key)
+        if plan is not None:
+            metrics.count('plan_cache_hit')
+            return plan
+        with self._lock:
+            # Another thread may have compiled it while this one waited for the lock
+            plan = self._plans.get(key)
+            if plan is None:
+                metrics.count('plan_cache_miss')
+                plan = self._generated_plan(key) or self._build_system_plan(*key)
+                self._plans[key] = plan
+                if not self.frozen:
+                    self._plan_deps[key] = self._dependencies(key[1] | set(targets))
+        return plan
+
+    def _build_system_plan(self, equation_names: Tuple[str, ...], known_vars: frozenset, targets: Tuple[str, ...]):
+        possible_subs = {var: expr for var, expr in self._find_substitutions(None, known_vars).items() if var not in targets}
+        equations = []
+        with metrics.timed('subs'):
+            for name in equation_names:
+                equation = self.equations[name]
+                for _ in range(10):
+                    substituted = equation.subs({self.symbols[var]: expr for var, expr in possible_subs.items()})
+                    if substituted == equation:
                         break
-            
-            if not changed:
-                break
-                
-        return possible_subs
+                    equation = substituted
+                if equation is not sp.true:
+                    equations.append(equation)
+        known_symbols = {self.symbols[var] for var in known_vars}
+        unknowns = sorted(set().union(*(eq.free_symbols for eq in equations)) - known_symbols, key=str)
+        missing = [target for target in targets if self.symbols[target] not in unknowns]
+        if missing:
+            raise ValueError(f"Targets {missing} do not appear as unknowns in equations {list(equation_names)}")
+        if len(unknowns) > len(equations):
+            raise ValueError(
+                f"Cannot solve system. Unknowns: {[str(u) for u in unknowns]}, "
+                f"Equations: {list(equation_names)}, Known: {sorted(known_vars)}"
+            )
+        with metrics.timed('sp_solve'):
+            solutions = sp.solve(equations, unknowns, dict=True)
+        target_symbols = [self.symbols[target] for target in targets]
+        usable = [solution for solution in solutions
+                  if all(sym in solution and solution[sym].free_symbols <= known_symbols for sym in target_symbols)]
+        if not usable:
+            raise ValueError(f"No solution found for {list(targets)} in equations {list(equation_names)}")
+        input_symbols = set()
+        for solution in usable:
+            for sym in target_symbols:
+                input_symbols |= solution[sym].free_symbols
+        inputs = tuple(sorted(str(sym) for sym in input_symbols))
+        args = [self.symbols[var] for var in inputs]
+        with metrics.timed('lambdify'):
+            return {
+                'inputs': inputs,
+                'expressions': [{target: solution[sym] for target, sym in zip(targets, target_symbols)}
+                                for solution in usable],
+                'solutions': [{target: sp.lambdify(args, solution[sym], modules='numpy')
+                               for target, sym in zip(targets, target_symbols)} for solution in usable],
+            }
 
-    def solve_smart(self, equation_name: str, primary_vars: List[str], **kwargs):
+    def _target_for(self, equation_name: str, primary_vars: List[str], known: Dict[str, Any]) -> str:
+        key = (equation_name, frozenset(known), tuple(primary_vars))
+        solve_for = self._targets.get(key)
+        if solve_for is not None:
+            metrics.count('target_cache_hit')
+            return solve_for
+        with self._lock:
+            solve_for = self._targets.get(key)
+            if solve_for is None:
+                metrics.count('target_cache_miss')
+                solve_for = self._select_target(equation_name, primary_vars, known)
+                self._targets[key] = solve_for
+                if not self.frozen:
+                    self._target_deps[key] = self._dependencies(set(known) | set(primary_vars))
+        return solve_for
+
+    def is_compiled(self, equation_name: str, known: Dict[str, Any], backend: str = 'auto') -> bool:
+        """True if solve_smart for this signature only evaluates a compiled or generated plan."""
+        primary_vars = self._variables.get(equation_name)
+        if primary_vars is None:
+            return False
+        known = frozenset(k for k, v in known.items() if v is not None)
+        solve_for = self._targets.get((equation_name, known, tuple(primary_vars)))
+        if solve_for is None:
+            return False
+        return self._has_plan((equation_name, frozenset(var for var in known if var in self.symbols), solve_for, backend))
+
+    def is_system_compiled(self, equation_names: List[str], known: Dict[str, Any], targets: List[str]) -> bool:
+        """True if solve_system for this signature only evaluates a compiled or generated plan."""
+        if self._pending and not self._resolved.issuperset(equation_names):
+            return False
+        known = frozenset(k for k, v in known.items() if v is not None and k in self.symbols)
+        return self._has_plan((tuple(equation_names), known, tuple(targets)))
+
+    def _has_plan(self, key: tuple) -> bool:
+        if key in self._plans:
+            return self._plans[key] is not None
+        return self._generated is not None and key in self._generated
+
+    def solve_batch(self, equation_name: str, primary_vars: List[str], units: Dict[str, Any] = None,
+                    backend: str = 'auto', **kwargs):
+        """Vectorized solve over arrays of inputs, broadcast against each other.
+
+        Inputs are pint Quantities wrapping arrays or plain arrays; plain arrays are read in
+        the unit given in `units` or, by default, the symbol's declared unit. Entries without a
+        valid solution come back as NaN instead of raising.
+        """
+        self._require((equation_name,))
         known = {k: v for k, v in kwargs.items() if v is not None}
-        
+        solve_for = self._target_for(equation_name, primary_vars, known)
+        plan = self._get_plan(equation_name, known, solve_for, backend)
+        if plan is None:
+            raise ValueError(f"No compiled solution for '{solve_for}' in equation '{equation_name}'; use solve() per point")
+        units = units or {}
+        with metrics.timed('unit_conversion'):
+            inputs = np.broadcast_arrays(*(self._si_array(var, known[var], units.get(var)) for var in plan['inputs']))
+        shape = inputs[0].shape if inputs else ()
+        if 'residual' in plan:
+            positive = bool(self.symbols[solve_for].is_positive)
+            result = np.empty(shape)
+            with metrics.timed('root_find'):
+                for index in np.ndindex(shape):
+                    try:
+                        result[index] = numeric_backend.find_root(plan['residual'], [x[index] for x in inputs], positive)
+                    except ValueError:
+                        result[index] = np.nan
+        else:
+            with np.errstate(invalid='ignore', divide='ignore'), metrics.timed('kernel_eval'):
+                result = np.broadcast_to(np.asarray(plan['kernel'](*inputs), dtype=float), shape).copy()
+        invalid = ~np.isfinite(result)
+        if self.symbols[solve_for].is_positive:
+            invalid |= result <= 0
+        result[invalid] = np.nan
+        return result * self.unit_map.get(solve_for, ureg.dimensionless)
+
+    def _si_array(self, var: str, value, unit=None):
+        if not hasattr(value, 'to_base_units'):
+            value = ureg.Quantity(np.asarray(value, dtype=float), unit or self.unit_map.get(var, ureg.dimensionless))
+        return np.asarray(value.to_base_units().magnitude, dtype=float)
+
+    def gradient(self, equation_name: str, primary_vars: List[str], wrt: List[str] = None, backend: str = 'auto',
+                 **kwargs) -> Dict[str, Any]:
+        """Partial derivatives of the solved target with respect to known inputs.
+
+        The target is selected as in solve_smart and the derivatives follow the substitution
+        chain (e.g. dt/dF through d from F and P). They are derived symbolically and compiled
+        once per solve plan; numeric-backend plans use the implicit function theorem at the
+        root. Inputs may be arrays, broadcast as in solve_batch, with NaN where there is no
+        solution. `wrt` defaults to all known inputs. Returns {input: Quantity} in SI units.
+        """
+        self._require((equation_name,))
+        known = {k: v for k, v in kwargs.items() if v is not None}
+        solve_for = self._target_for(equation_name, primary_vars, known)
+        wrt = self._check_wrt(wrt, known)
+        plan = self._get_plan(equation_name, known, solve_for, backend)
+        if plan is None:
+            raise ValueError(f"No compiled solution for '{solve_for}' in equation '{equation_name}' to differentiate")
+        inputs = np.broadcast_arrays(*(np.asarray(self._si_magnitude(known[var]), dtype=float)
+                                       for var in plan['inputs']))
+        shape = inputs[0].shape if inputs else ()
+        kernel = self._gradient_kernel(plan, solve_for)
+        partials = np.full((len(plan['inputs']),) + shape, np.nan)
+        positive = bool(self.symbols[solve_for].is_positive)
+        if 'residual' in plan:
+            with metrics.timed('root_find'):
+                for index in np.ndindex(shape):
+                    args = [x[index] for x in inputs]
+                    try:
+                        root = numeric_backend.find_root(plan['residual'], args, positive)
+                        partials[(slice(None),) + index] = kernel(root, *args)
+                    except (ValueError, ZeroDivisionError):
+                        pass
+        else:
+            with np.errstate(invalid='ignore', divide='ignore'), metrics.timed('kernel_eval'):
+                value = np.asarray(plan['kernel'](*inputs), dtype=float)
+                valid = np.isfinite(value) & ((value > 0) | (not positive))
+                for i, partial in enumerate(kernel(*inputs)):
+                    partials[i] = np.where(valid, partial, np.nan)
+        if not shape and plan['inputs'] and not np.isfinite(partials).all():
+            raise ValueError(f"No valid solution for '{solve_for}' in equation '{equation_name}' to differentiate.\n"
+                             f"Known inputs: {known}")
+        by_input = dict(zip(plan['inputs'], partials))
+        invalid = ~np.isfinite(partials).all(axis=0)
+        return {var: self._derivative(by_input.get(var), shape, solve_for, var, invalid) for var in wrt}
+
+    def jacobian(self, equation_names: List[str], known: Dict[str, Any], targets: List[str],
+                 wrt: List[str] = None) -> Dict[str, Dict[str, Any]]:
+        """Derivatives {target: {input: Quantity}} of a solve_system solution.
+
+        Each point uses the solution branch solve_system picks (the first valid one). The
+        Jacobian of every branch is compiled once and cached with the system plan. Inputs
+        may be arrays; points without a valid solution get NaN.
+        """
+        self._require(equation_names)
+        known = {k: v for k, v in known.items() if v is not None}
+        plan = self._get_system_plan(equation_names, known, targets)
+        wrt = self._check_wrt(wrt, known)
+        inputs = np.broadcast_arrays(*(np.asarray(self._si_magnitude(known[var]), dtype=float)
+                                       for var in plan['inputs']))
+        shape = inputs[0].shape if inputs else ()
+        kernels = self._jacobian_kernels(plan)
+        branch = np.full(shape, -1)
+        partials = {target: np.full((len(plan['inputs']),) + shape, np.nan) for target in targets}
+        with np.errstate(invalid='ignore', divide='ignore'), metrics.timed('kernel_eval'):
+            for i, solution in enumerate(plan['solutions']):
+                valid = branch < 0
+                for target, kernel in solution.items():
+                    value = np.asarray(kernel(*inputs), dtype=float)
+                    valid = valid & np.isfinite(value) & ((value > 0) | (not self.symbols[target].is_positive))
+                if not valid.any():
+                    continue
+                branch[valid] = i
+                for target, kernel in kernels[i].items():
+                    for j, partial in enumerate(kernel(*inputs)):
+                        partials[target][j] = np.where(valid, partial, partials[target][j])
+        if not shape and branch < 0:
+            raise ValueError(f"No valid solution for {list(targets)} in equations {list(equation_names)}.\n"
+                             f"Known inputs: {known}")
+        return {target: {var: self._derivative(dict(zip(plan['inputs'], partials[target])).get(var), shape,
+                                               target, var, invalid=branch < 0)
+                         for var in wrt}
+                for target in targets}
+
+    def _check_wrt(self, wrt: List[str], known: Dict[str, Any]) -> List[str]:
+        if wrt is None:
+            return [var for var in known if var in self.symbols]
+        unknown = [var for var in wrt if var not in known]
+        if unknown:
+            raise ValueError(f"Can only differentiate with respect to known inputs; not given: {unknown}")
+        return list(wrt)
+
+    def _derivative(self, partial, shape, target: str, var: str, invalid=None):
+        """SI derivative as a Quantity; inputs the solution does not depend on give 0."""
+        if partial is None:
+            partial = np.zeros(shape)
+            if invalid is not None:
+                partial[invalid] = np.nan
+        units = self.unit_map.get(target, ureg.dimensionless) / self.unit_map.get(var, ureg.dimensionless)
+        return (float(partial) if not shape else partial) * units
+
+    def _gradient_kernel(self, plan: Dict[str, Any], solve_for: str):
+        """Compile, once per plan, the partials of its solution w.r.t. the plan inputs."""
+        kernel = plan.get('gradient')
+        if kernel is not None:
+            return kernel
+        with self._lock:
+            kernel = plan.get('gradient')
+            if kernel is not None:
+                return kernel
+            args = [self.symbols[var] for var in plan['inputs']]
+            expression = self._expression(plan['expression'])
+            with metrics.timed('differentiate'):
+                if 'residual' in plan:
+                    # Implicit function theorem: dx/dy = -(dR/dy) / (dR/dx) on R(x, y) = 0
+                    target = self.symbols[solve_for]
+                    slope = sp.diff(expression, target)
+                    partials = [-sp.diff(expression, arg) / slope for arg in args]
+                else:
+                    partials = [sp.diff(expression, arg) for arg in args]
+            with metrics.timed('lambdify'):
+                if 'residual' in plan:
+                    kernel = sp.lambdify([target] + args, partials, modules='math')
+                else:
+                    kernel = sp.lambdify(args, partials, modules='numpy')
+            plan['gradient'] = kernel
+        return kernel
+
+    def _jacobian_kernels(self, plan: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Compile, once per system plan, each branch's partials w.r.t. the plan inputs."""
+        kernels = plan.get('jacobian')
+        if kernels is not None:
+            return kernels
+        with self._lock:
+            kernels = plan.get('jacobian')
+            if kernels is not None:
+                return kernels
+            args = [self.symbols[var] for var in plan['inputs']]
+            with metrics.timed('differentiate'):
+                partials = [{target: [sp.diff(self._expression(expression), arg) for arg in args]
+                             for target, expression in solution.items()}
+                            for solution in plan['expressions']]
+            with metrics.timed('lambdify'):
+                kernels = [{target: sp.lambdify(args, derivatives, modules='numpy')
+                            for target, derivatives in solution.items()} for solution in partials]
+            plan['jacobian'] = kernels
+        return kernels
+
+    def _select_target(self, equation_name: str, primary_vars: List[str], known: Dict[str, Any]) -> str:
         # Get all possible substitutions through deep chaining
         possible_subs = self._find_substitutions(equation_name, known)
         
@@ -110,6 +836,12 @@ class SymbolicSolver:
         truly_missing = [var for var in primary_vars if var not in effective_known]
         
         if len(truly_missing) > 1:
+            # Implicit case: one missing variable determines the others through the rules
+            # (e.g. D gives Re gives f); the equation is then solved numerically for it
+            implicit = [var for var in truly_missing
+                        if set(truly_missing) <= {var} | set(self._find_substitutions(equation_name, set(known) | {var}))]
+            if len(implicit) == 1:
+                return implicit[0]
             raise ValueError(f"Cannot solve. Missing: {truly_missing}, Available subs: {list(possible_subs)}, Known: {list(known)}")
         
         # Determine what to solve for
@@ -122,8 +854,7 @@ class SymbolicSolver:
         
         if solve_for is None:
             raise ValueError(f"Cannot determine what to solve for in equation '{equation_name}'")
-            
-        return self._solve(equation_name, known, solve_for)
+        return solve_for
 
     def _determine_best_solve_target(self, equation_name: str, candidates: List[str], known: Dict, possible_subs: Dict) -> str:
         non_substitutable = [var for var in candidates if var not in possible_subs]
@@ -139,39 +870,163 @@ class SymbolicSolver:
                 return candidate
         return candidates[0] if candidates else None
     
-    def _solve(self, equation_name: str, known: Dict[str, Any], solve_for: str):
-        equation = self.equations[equation_name]
-        substituted_eq = equation
+    def _solve(self, equation_name: str, known: Dict[str, Any], solve_for: str, backend: str = 'auto') -> float:
+        plan = self._get_plan(equation_name, known, solve_for, backend)
+        if plan is not None:
+            args = [self._si_magnitude(known[var]) for var in plan['inputs']]
+            if 'residual' in plan:
+                try:
+                    with metrics.timed('root_find'):
+                        return numeric_backend.find_root(plan['residual'], args, bool(self.symbols[solve_for].is_positive))
+                except ValueError:
+                    raise ValueError(
+                        f"No solution found for '{solve_for}' in equation '{equation_name}'.\n"
+                        f"Residual: {plan['expression']}\n"
+                        f"Known inputs: {known}"
+                    ) from None
+            with np.errstate(invalid='ignore', divide='ignore'), metrics.timed('kernel_eval'):
+                result = float(plan['kernel'](*args))
+            # Results violating the symbol assumptions go through sympy for its error reporting
+            if math.isfinite(result) and (result > 0 or not self.symbols[solve_for].is_positive):
+                return result
+        elif backend == 'numeric':
+            raise ValueError(f"Cannot build a numeric residual for '{solve_for}' in equation '{equation_name}'")
+        return self._solve_substituted(equation_name, known, solve_for)
+
+    def _get_plan(self, equation_name: str, known: Dict[str, Any], solve_for: str, backend: str = 'auto'):
+        """Return the compiled solve plan for this (equation, known-set, target, backend) signature."""
+        if backend not in ('auto', 'symbolic', 'numeric'):
+            raise ValueError(f"Unknown solve backend '{backend}'")
+        key = (equation_name, frozenset(var for var in known if var in self.symbols), solve_for, backend)
+        try:
+            plan = self._plans[key]
+        except KeyError:
+            pass
+        else:
+            metrics.count('plan_cache_hit')
+            return plan
+        with self._lock:
+            if key in self._plans:
+                metrics.count('plan_cache_hit')
+                return self._plans[key]
+            metrics.count('plan_cache_miss')
+            known_vars = key[1]
+            plan = self._generated_plan(key)
+            if plan is None:
+                plan = self._compile_plan(equation_name, known_vars, solve_for, backend)
+            self._plans[key] = plan
+            if not self.frozen:
+                self._plan_deps[key] = self._dependencies(known_vars | {solve_for})
+        return plan
+
+    def _compile_plan(self, equation_name: str, known_vars: frozenset, solve_for: str, backend: str):
+        substituted_eq = self._substitute_chain(equation_name, known_vars, solve_for)
+        if backend == 'numeric':
+            return self._build_numeric_plan(equation_name, known_vars, solve_for, substituted_eq)
+        if backend == 'symbolic' or not numeric_backend.prefers_numeric(substituted_eq, self.symbols[solve_for]):
+            plan = self._build_plan(known_vars, solve_for, substituted_eq)
+            if plan is None and backend == 'auto':
+                plan = self._build_numeric_plan(equation_name, known_vars, solve_for, substituted_eq)
+            return plan
+        return self._build_numeric_plan(equation_name, known_vars, solve_for, substituted_eq)
+
+    def _generated_plan(self, key: tuple):
+        """The ahead-of-time compiled plan for `key`, if the generated module has one."""
+        if self._generated is None:
+            return None
+        plan = self._generated.get(key)
+        if plan is None:
+            return None
+        metrics.count('generated_plan_hit')
+        # Own copy: derivative kernels get cached into it
+        return dict(plan)
+
+    def _expression(self, expression):
+        """Generated plans carry their solution as a string; parse it for differentiation."""
+        if isinstance(expression, str):
+            return sp.sympify(expression, locals=dict(self.symbols))
+        return expression
+
+    def _build_plan(self, known_vars: frozenset, solve_for: str, substituted_eq: sp.Eq):
+        """Solve the substituted equation symbolically once and lambdify the solution.
+
+        Returns None when no closed form in terms of the known symbols exists, in which
+        case callers fall back to numeric root finding or solving with the numbers substituted.
+        """
+        try:
+            with metrics.timed('sp_solve'):
+                solutions = sp.solve(substituted_eq, self.symbols[solve_for])
+        except Exception:
+            return None
+        if not solutions:
+            return None
+        expression = solutions[0]
+        known_symbols = {self.symbols[var] for var in known_vars}
+        if not expression.free_symbols <= known_symbols:
+            return None
+        inputs = tuple(sorted(str(sym) for sym in expression.free_symbols))
+        with metrics.timed('lambdify'):
+            kernel = sp.lambdify([self.symbols[var] for var in inputs], expression, modules='numpy')
+        return {'inputs': inputs, 'expression': expression, 'kernel': kernel}
+
+    def _build_numeric_plan(self, equation_name: str, known_vars: frozenset, solve_for: str, substituted_eq: sp.Eq):
+        """Compile the residual lhs - rhs as a function of the target and the known symbols."""
+        target = self.symbols[solve_for]
+        allowed = {self.symbols[var] for var in known_vars} | {target}
+        if not substituted_eq.free_symbols <= allowed:
+            # Chain intermediate symbols through the target as well (e.g. f from Re from D)
+            substituted_eq = self._substitute_chain(equation_name, known_vars | {solve_for}, solve_for)
+        if not isinstance(substituted_eq, sp.Eq) or not substituted_eq.free_symbols <= allowed \
+                or target not in substituted_eq.free_symbols:
+            return None
+        residual = substituted_eq.lhs - substituted_eq.rhs
+        inputs = tuple(sorted(str(sym) for sym in residual.free_symbols - {target}))
+        with metrics.timed('lambdify'):
+            kernel = sp.lambdify([target] + [self.symbols[var] for var in inputs], residual, modules='math')
+        return {'inputs': inputs, 'expression': residual, 'residual': kernel}
+
+    def _substitute_chain(self, equation_name: str, known: Dict[str, Any], solve_for: str) -> sp.Eq:
+        substituted_eq = self.equations[equation_name]
         possible_subs = self._find_substitutions(equation_name, known)
-        for _ in range(10):
-            changed = False
-            for var, sub_expr in possible_subs.items():
-                if var != solve_for:
-                    old_eq = substituted_eq
-                    substituted_eq = substituted_eq.subs(self.symbols[var], sub_expr)
-                    if substituted_eq != old_eq:
-                        changed = True
-            if not changed:
-                break
+        with metrics.timed('subs'):
+            for _ in range(10):
+                changed = False
+                for var, sub_expr in possible_subs.items():
+                    if var != solve_for:
+                        old_eq = substituted_eq
+                        substituted_eq = substituted_eq.subs(self.symbols[var], sub_expr)
+                        if substituted_eq != old_eq:
+                            changed = True
+                if not changed:
+                    break
+        return substituted_eq
+
+    def _si_magnitude(self, value):
+        # Convert to SI base units before extracting magnitude
+        if hasattr(value, 'to_base_units'):
+            with metrics.timed('unit_conversion'):
+                return value.to_base_units().magnitude
+        return value
+
+    @_locked
+    def _solve_substituted(self, equation_name: str, known: Dict[str, Any], solve_for: str) -> float:
+        """Substitute the known values and solve; slow path for inputs without a compiled plan."""
+        equation = self.equations[equation_name]
+        substituted_eq = self._substitute_chain(equation_name, known, solve_for)
         for var, value in known.items():
             if var in self.symbols:
-                # Convert to SI base units before extracting magnitude
-                if hasattr(value, 'to_base_units'):
-                    substituted_eq = substituted_eq.subs(self.symbols[var], value.to_base_units().magnitude)
-                else:
-                    substituted_eq = substituted_eq.subs(self.symbols[var], value)
+                substituted_eq = substituted_eq.subs(self.symbols[var], self._si_magnitude(value))
         target_symbol = self.symbols[solve_for]
-        solutions = sp.solve(substituted_eq, target_symbol)
+        with metrics.timed('sp_solve'):
+            solutions = sp.solve(substituted_eq, target_symbol)
         if not solutions:
             raise ValueError(
                 f"No solution found for '{solve_for}' in equation '{equation_name}'.\n"
                 f"Equation: {equation}\n"
                 f"Known inputs: {known}"
             )
-        try:
-            result = float(solutions[0].evalf())
-        except Exception:
-            result = float(sp.simplify(solutions[0]).evalf())
-        if solve_for in self.unit_map:
-            result = result * self.unit_map[solve_for]
-        return result
\ No newline at end of file
+        with metrics.timed('evalf'):
+            try:
+                return float(solutions[0].evalf())
+            except Exception:
+                return float(sp.simplify(solutions[0]).evalf())
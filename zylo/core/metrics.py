@@ -0,0 +1,133 @@
+"""
+Lightweight, toggleable timing and counters for the solver and workflows.
+
+Disabled by default; enable with the ZYLO_METRICS=1 environment variable or
+`metrics.enable()`. When disabled, `timed()` returns a shared no-op context
+manager and `count()` returns immediately, so instrumented hot paths pay only a
+flag check.
+
+Phase timings are aggregated into fixed-bucket histograms and rendered in the
+Prometheus text exposition format by `render_prometheus()` (served by the
+`metrics` view in core.views).
+"""
+import bisect
+import os
+import threading
+import time
+from typing import Dict, List
+
+# Upper bounds in seconds, from microsecond kernel evaluations to multi-second sp.solve calls
+BUCKETS = (1e-6, 5e-6, 1e-5, 5e-5, 1e-4, 5e-4, 1e-3, 5e-3, 1e-2, 5e-2, 0.1, 0.5, 1.0, 5.0, 10.0)
+
+_enabled = os.environ.get('ZYLO_METRICS', '0') == '1'
+_lock = threading.Lock()
+_histograms: Dict[str, List] = {}
+_counters: Dict[str, int] = {}
+
+
+def enable():
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def reset():
+    with _lock:
+        _histograms.clear()
+        _counters.clear()
+
+
+def observe(phase: str, seconds: float):
+    """Record one duration for `phase`."""
+    index = bisect.bisect_left(BUCKETS, seconds)
+    with _lock:
+        histogram = _histograms.get(phase)
+        if histogram is None:
+            # Per-bucket counts (last slot is +Inf), then sum and count
+            histogram = _histograms[phase] = [[0] * (len(BUCKETS) + 1), 0.0, 0]
+        histogram[0][index] += 1
+        histogram[1] += seconds
+        histogram[2] += 1
+
+
+def count(event: str, n: int = 1):
+    """Increment the counter for `event`, e.g. 'plan_cache_hit'."""
+    if not _enabled:
+        return
+    with _lock:
+        _counters[event] = _counters.get(event, 0) + n
+
+
+class _Timer:
+    __slots__ = ('phase', 'start')
+
+    def __init__(self, phase: str):
+        self.phase = phase
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        observe(self.phase, time.perf_counter() - self.start)
+        return False
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+def timed(phase: str):
+    """Context manager timing a phase, e.g. `with metrics.timed('sp_solve'): ...`."""
+    return _Timer(phase) if _enabled else _NULL_TIMER
+
+
+def snapshot() -> Dict:
+    """Copy of the aggregated histograms and counters."""
+    with _lock:
+        return {
+            'histograms': {phase: {'buckets': list(h[0]), 'sum': h[1], 'count': h[2]} for phase, h in _histograms.items()},
+            'counters': dict(_counters),
+        }
+
+
+def render_prometheus() -> str:
+    """Aggregated metrics in the Prometheus text exposition format."""
+    data = snapshot()
+    lines = [
+        '# HELP zylo_phase_seconds Time spent in solver and workflow phases.',
+        '# TYPE zylo_phase_seconds histogram',
+    ]
+    for phase, histogram in sorted(data['histograms'].items()):
+        cumulative = 0
+        for bound, n in zip(BUCKETS + (float('inf'),), histogram['buckets']):
+            cumulative += n
+            le = '+Inf' if bound == float('inf') else repr(bound)
+            lines.append(f'zylo_phase_seconds_bucket{{phase="{phase}",le="{le}"}} {cumulative}')
+        lines.append(f'zylo_phase_seconds_sum{{phase="{phase}"}} {histogram["sum"]!r}')
+        lines.append(f'zylo_phase_seconds_count{{phase="{phase}"}} {histogram["count"]}')
+    lines += [
+        '# HELP zylo_events_total Solver events such as cache hits and misses.',
+        '# TYPE zylo_events_total counter',
+    ]
+    for event, n in sorted(data['counters'].items()):
+        lines.append(f'zylo_events_total{{event="{event}"}} {n}')
+    lines.append(f'zylo_metrics_enabled {int(_enabled)}')
+    return '\n'.join(lines) + '\n'
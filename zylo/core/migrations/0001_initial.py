@@ -0,0 +1,75 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Domain',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=64, unique=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Material',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=64, unique=True)),
+                ('type', models.CharField(blank=True, max_length=64)),
+                ('yield_strength', models.FloatField(help_text='Pa')),
+                ('ultimate_strength', models.FloatField(blank=True, help_text='Pa', null=True)),
+                ('density', models.FloatField(help_text='kg/m^3')),
+                ('young_modulus', models.FloatField(blank=True, help_text='Pa', null=True)),
+                ('poisson_ratio', models.FloatField(blank=True, null=True)),
+                ('thermal_expansion', models.FloatField(blank=True, help_text='1/K', null=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='RuleSet',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('domains', models.CharField(max_length=256, unique=True)),
+                ('key', models.CharField(max_length=64)),
+                ('payload', models.BinaryField()),
+                ('created', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Equation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=64, unique=True)),
+                ('expression', models.CharField(max_length=512)),
+                ('metadata', models.JSONField(blank=True, default=dict)),
+                ('position', models.PositiveIntegerField(default=0)),
+                ('domain', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='equations', to='core.domain')),
+            ],
+            options={
+                'ordering': ['domain', 'position'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Symbol',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=64)),
+                ('units', models.CharField(default='dimensionless', max_length=128)),
+                ('description', models.CharField(blank=True, max_length=256)),
+                ('position', models.PositiveIntegerField(default=0)),
+                ('domain', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='symbols', to='core.domain')),
+            ],
+            options={
+                'ordering': ['domain', 'position'],
+                'constraints': [models.UniqueConstraint(fields=('domain', 'name'), name='unique_symbol_per_domain')],
+            },
+        ),
+    ]
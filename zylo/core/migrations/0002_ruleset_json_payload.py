@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:50
+
+from django.db import migrations, models
+
+
+def drop_pickled_rules(apps, schema_editor):
+    # Pickled payloads are never read again; load_physics_db or the next solver load rebuilds them
+    apps.get_model('core', 'RuleSet').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_pickled_rules, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='ruleset',
+            name='payload',
+            field=models.TextField(),
+        ),
+    ]
@@ -1,3 +1,72 @@
 from django.db import models
 
-# Create your models here.
+# Physics and materials data, bulk-loaded from PHYSICS_DB / MATERIALS_DB by
+# `manage.py load_physics_db` and read back by SymbolicSolver.load_from_database.
+
+
+class Domain(models.Model):
+    name = models.CharField(max_length=64, unique=True)
+
+    def __str__(self):
+        return self.name
+
+
+class Symbol(models.Model):
+    domain = models.ForeignKey(Domain, on_delete=models.CASCADE, related_name='symbols')
+    name = models.CharField(max_length=64)
+    units = models.CharField(max_length=128, default='dimensionless')
+    description = models.CharField(max_length=256, blank=True)
+    # Declaration order within the domain; rule detection depends on it
+    position = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ['domain', 'position']
+        constraints = [models.UniqueConstraint(fields=['domain', 'name'], name='unique_symbol_per_domain')]
+
+    def __str__(self):
+        return f"{self.domain}.{self.name} [{self.units}]"
+
+
+class Equation(models.Model):
+    domain = models.ForeignKey(Domain, on_delete=models.CASCADE, related_name='equations')
+    name = models.CharField(max_length=64, unique=True)
+    expression = models.CharField(max_length=512)
+    # Everything else from the PHYSICS_DB entry: output, inputs, bidirectional, ...
+    metadata = models.JSONField(default=dict, blank=True)
+    position = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ['domain', 'position']
+
+    def __str__(self):
+        return f"{self.name}: {self.expression}"
+
+
+class Material(models.Model):
+    """Material properties in SI units."""
+    name = models.CharField(max_length=64, unique=True)
+    type = models.CharField(max_length=64, blank=True)
+    yield_strength = models.FloatField(help_text="Pa")
+    ultimate_strength = models.FloatField(null=True, blank=True, help_text="Pa")
+    density = models.FloatField(help_text="kg/m^3")
+    young_modulus = models.FloatField(null=True, blank=True, help_text="Pa")
+    poisson_ratio = models.FloatField(null=True, blank=True)
+    thermal_expansion = models.FloatField(null=True, blank=True, help_text="1/K")
+
+    def __str__(self):
+        return self.name
+
+
+class RuleSet(models.Model):
+    """Parsed equations and derived substitution rules for one domain list (rule_cache JSON).
+
+    `key` is the content hash of the domain data and detector source the rules were
+    derived from; a mismatch means the rules are stale and get recomputed.
+    """
+    domains = models.CharField(max_length=256, unique=True)
+    key = models.CharField(max_length=64)
+    payload = models.TextField()
+    created = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return self.domains
@@ -1,3 +1,37 @@
+import functools
+import logging
+import os
+from pathlib import Path
+
 import pint
 
-ureg = pint.UnitRegistry()
\ No newline at end of file
+
+def _unit_registry() -> pint.UnitRegistry:
+    """Unit registry with its parsed definitions cached on disk.
+
+    Parsing pint's definition file dominates cold starts; the cache lives in
+    $ZYLO_CACHE_DIR/pint (default ~/.cache/zylo/pint). Set ZYLO_UNIT_CACHE=0 to disable.
+    """
+    if os.environ.get('ZYLO_UNIT_CACHE', '1') != '0':
+        cache_dir = Path(os.environ.get('ZYLO_CACHE_DIR', Path.home() / '.cache' / 'zylo')) / 'pint'
+        try:
+            return pint.UnitRegistry(cache_folder=cache_dir)
+        except Exception as e:
+            logging.warning(f"Unit registry cache unavailable ({e}); parsing definitions")
+    return pint.UnitRegistry()
+
+
+ureg = _unit_registry()
+
+
+@functools.lru_cache(maxsize=None)
+def si_conversion(units):
+    """(scale factor to SI base units, dimensionality) for `units`.
+
+    The factor is None for non-multiplicative units such as degC, which need a full conversion.
+    """
+    quantity = ureg.Quantity(1.0, units)
+    factor = quantity.to_base_units().magnitude
+    if ureg.Quantity(0.0, units).to_base_units().magnitude != 0:
+        factor = None
+    return factor, quantity.dimensionality
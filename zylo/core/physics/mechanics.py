@@ -1,15 +1,150 @@
-from zylo.core.math.symbolic_solver import SymbolicSolver
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import pint
+
+from zylo.core import metrics
+from zylo.core.math import result_cache
+from zylo.core.math.solver_registry import get_solver
+from zylo.core.physics.conversions import ureg
+
+DOMAINS = ['geometry', 'mechanics', 'fluids']
 
 class mechanics:
     """Physics calculator with automatic equation solving."""
     
-    def __init__(self, name: str = ''):
+    def __init__(self, name: str = '', fast_units: bool = False, lazy: bool = False):
         self.name = name
-        self.solver = SymbolicSolver()
-        self.solver.load_from_database(['geometry', 'mechanics', 'fluids'])
+        # Shared read-only snapshot; use self.solver.copy() to extend it.
+        # lazy=True shares a solver that parses equations only when a solve needs them
+        self.solver = get_solver(DOMAINS, lazy=lazy)
+        self.lazy = lazy
+        # Strip units once at the boundary (with a dimension check) and solve on raw SI floats
+        self.fast_units = fast_units
     
-    def solve(self, equation_name: str, **kwargs):
-        """Generic solve method - works for any equation."""
-        equation = self.solver.equations[equation_name]
-        primary_vars = [str(sym) for sym in equation.free_symbols]
-        return self.solver.solve_smart(equation_name, primary_vars, **kwargs)
\ No newline at end of file
+    def solve(self, equation_name: str, backend: str = 'auto', **kwargs):
+        """Generic solve method - works for any equation.
+
+        backend: 'auto', 'symbolic' or 'numeric' (scipy root finding on the residual).
+        """
+        key = self._cache_key(equation_name, backend, kwargs)
+        if key is not None:
+            result = result_cache.SOLVE_CACHE.get(key, None)
+            if result is not None:
+                return result
+        result = self._solve(equation_name, backend, kwargs)
+        if key is not None:
+            result_cache.SOLVE_CACHE.put(key, result)
+        return result
+
+    def _solve(self, equation_name: str, backend: str, kwargs: dict):
+        """Solve without the result cache."""
+        primary_vars = self.solver.equation_variables(equation_name)
+        if self.fast_units:
+            kwargs = self._strip_units(kwargs)
+        return self.solver.solve_smart(equation_name, primary_vars, backend=backend, **kwargs)
+
+    async def solve_async(self, equation_name: str, backend: str = 'auto', executor=None, timeout: float = None,
+                          **kwargs):
+        """Awaitable solve: memoized results and compiled plans are evaluated inline, symbolic work
+        runs on an executor and is shared by concurrent identical calls (see zylo.core.aio).
+        """
+        from zylo.core import aio
+        key = self._request_key(equation_name, backend, kwargs)
+        # One lookup per request, so the cache statistics count each solve once
+        cached = key is not None and result_cache.SOLVE_CACHE.maxsize > 0
+        if cached:
+            result = result_cache.SOLVE_CACHE.get(key, None)
+            if result is not None:
+                return result
+        si = self._si_inputs(kwargs)
+        if self.solver.is_compiled(equation_name, kwargs, backend):
+            metrics.count('async_inline')
+            result = self._solve(equation_name, backend, kwargs)
+        elif si is not None and self.solver is get_solver(DOMAINS, lazy=self.lazy):
+            # Picklable for process executors: SI inputs in, the worker looks the solver up again
+            task = partial(_solve_task, self.fast_units, self.lazy, equation_name, backend, si)
+            magnitude, units = await aio.run_coalesced(key and ('solve',) + key, task, executor, timeout)
+            result = ureg.Quantity(magnitude, units)
+        elif isinstance(executor or aio.get_executor(), ProcessPoolExecutor):
+            raise TypeError("solve_async needs a thread executor for a solver outside the registry "
+                            "(e.g. solver.copy()) or inputs of the wrong dimension")
+        else:
+            result = await aio.run_coalesced(key and ('solve',) + key,
+                                             partial(self._solve, equation_name, backend, kwargs), executor, timeout)
+        if cached:
+            result_cache.SOLVE_CACHE.put(key, result)
+        return result
+
+    def _cache_key(self, equation_name: str, backend: str, kwargs: dict):
+        """Memoization key from SI-normalized inputs; None for mutable solvers or array inputs."""
+        if result_cache.SOLVE_CACHE.maxsize <= 0:
+            return None
+        return self._request_key(equation_name, backend, kwargs)
+
+    def _request_key(self, equation_name: str, backend: str, kwargs: dict):
+        if not self.solver.frozen:
+            return None
+        si = self._si_inputs(kwargs)
+        if si is None:
+            return None
+        inputs = []
+        for name, value in sorted(si.items()):
+            value = result_cache.normalize(value)
+            if value is None:
+                return None
+            inputs.append((name, value))
+        # The solver snapshot is part of the key, so a reloaded registry never serves stale results
+        return (self.solver, equation_name, backend, tuple(inputs))
+
+    def solve_value(self, equation_name: str, backend: str = 'auto', **kwargs) -> float:
+        """Solve and return the SI magnitude as a plain float - no units attached."""
+        primary_vars = self.solver.equation_variables(equation_name)
+        return self.solver.solve_value(equation_name, primary_vars, backend=backend, **self._strip_units(kwargs))
+
+    def solve_system(self, equation_names: list, targets: list, **kwargs):
+        """Solve several equations together - returns {target: Quantity}."""
+        if self.fast_units:
+            kwargs = self._strip_units(kwargs)
+        return self.solver.solve_system(equation_names, kwargs, targets)
+
+    def solve_system_values(self, equation_names: list, targets: list, **kwargs) -> dict:
+        """Solve several equations together - returns {target: SI float}."""
+        return self.solver.solve_system_values(equation_names, self._strip_units(kwargs), targets)
+
+    def _strip_units(self, kwargs: dict) -> dict:
+        return {name: self.solver.to_si(name, value) for name, value in kwargs.items() if value is not None}
+
+    def _si_inputs(self, kwargs: dict):
+        """SI inputs, or None if one does not match its symbol's dimension.
+
+        Only fast_units solves check dimensions; the others stay unmemoized and pass the
+        Quantities to the solver as before.
+        """
+        try:
+            return self._strip_units(kwargs)
+        except pint.DimensionalityError:
+            return None
+
+    def solve_batch(self, equation_name: str, units: dict = None, backend: str = 'auto', **kwargs):
+        """Vectorized solve - array inputs in, Quantity array out."""
+        primary_vars = self.solver.equation_variables(equation_name)
+        return self.solver.solve_batch(equation_name, primary_vars, units=units, backend=backend, **kwargs)
+
+    def gradient(self, equation_name: str, wrt: list = None, backend: str = 'auto', **kwargs) -> dict:
+        """Partial derivatives of the solved variable w.r.t. the given inputs - {input: Quantity}.
+
+        Works on scalars and arrays; e.g. calc.gradient('kessel', wrt=['P'], P=..., F=..., ...)['P'].to('mm/bar').
+        """
+        primary_vars = self.solver.equation_variables(equation_name)
+        return self.solver.gradient(equation_name, primary_vars, wrt=wrt, backend=backend, **kwargs)
+
+    def jacobian(self, equation_names: list, targets: list, wrt: list = None, **kwargs) -> dict:
+        """Derivatives of a solve_system solution - {target: {input: Quantity}}."""
+        return self.solver.jacobian(equation_names, kwargs, targets, wrt=wrt)
+
+
+def _solve_task(fast_units: bool, lazy: bool, equation_name: str, backend: str, kwargs: dict):
+    """solve_async work item: SI inputs in, (magnitude, units) out, so it runs in any executor."""
+    result = mechanics(fast_units=fast_units, lazy=lazy)._solve(equation_name, backend, kwargs)
+    return result.magnitude, str(result.units)
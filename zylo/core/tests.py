@@ -1,3 +1,707 @@
-from django.test import TestCase
+import asyncio
+import json
+import math
+import multiprocessing
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import warnings
+from io import StringIO
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+import pint
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
+
+from zylo.core import metrics
+from zylo.core.data import db_source
+from zylo.core.data.materials_db import MATERIALS_DB, materials
+from zylo.core.data.materials_table import materials_table
+from zylo.core.data.physics_db import PHYSICS_DB
+from zylo.core.math import codegen, result_cache, rule_cache, solver_registry
+from zylo.core.math.symbolic_solver import SymbolicSolver
+from zylo.core.models import Domain, Equation, Material, RuleSet, Symbol
+from zylo.core.physics.conversions import ureg
+from zylo.core.physics.mechanics import DOMAINS, mechanics
+from zylo.core.workflow import cylinder_optimizer, export, sweep, uncertainty, worker_pool
+from zylo.core.workflow.hydraulic_cylinder_workflow import SIZING_EQUATIONS, HydraulicCylinderWorkflow
+
+
+class LoadPhysicsDbTests(TestCase):
+    def test_command_loads_data_and_rules(self):
+        out = StringIO()
+        call_command('load_physics_db', '--rules', 'mechanics', stdout=out)
+        self.assertIn('Stored', out.getvalue())
+        self.assertEqual(Domain.objects.count(), len(PHYSICS_DB['domains']))
+        self.assertEqual(Equation.objects.count(),
+                         sum(len(domain['equations']) for domain in PHYSICS_DB['domains'].values()))
+        self.assertTrue(Symbol.objects.exists())
+        stored = json.loads(RuleSet.objects.get(domains='mechanics').payload)
+        self.assertIn('kessel', stored['equations'])
+
+        physics_db = db_source.load_physics_db(['mechanics'])
+        self.assertEqual(set(physics_db['domains']['mechanics']['equations']),
+                         set(PHYSICS_DB['domains']['mechanics']['equations']))
+        self.assertIsNotNone(db_source.load_rules(['mechanics'], physics_db))
+        solver = SymbolicSolver()
+        solver.load_from_database(['mechanics'])
+        self.assertEqual(set(solver.equations), set(PHYSICS_DB['domains']['mechanics']['equations']))
+
+    def test_materials_are_read_from_the_table(self):
+        call_command('load_physics_db', '--no-rules', stdout=StringIO())
+        self.addCleanup(result_cache.invalidate)
+        self.assertEqual(Material.objects.count(), len(MATERIALS_DB))
+        Material.objects.filter(name='S355').update(yield_strength=500e6)
+        Material.objects.create(name='Custom', type='steel', yield_strength=420e6, density=7850.0)
+        result_cache.invalidate()
+
+        catalog = materials()
+        self.assertEqual(catalog['S355']['yield_strength'], 500e6 * ureg.Pa)
+        self.assertEqual(catalog['S355']['density'], MATERIALS_DB['S355']['density'])
+        self.assertNotIn('young_modulus', catalog['Custom'])
+        workflow = HydraulicCylinderWorkflow(100 * ureg.kN, 200 * ureg.bar, 500 * ureg.mm, 'Custom')
+        self.assertEqual(workflow.material['yield_strength'], 420e6 * ureg.Pa)
+
+
+class AsyncLoadTests(TransactionTestCase):
+    # Committed data: the ORM runs on a worker thread with its own connection
+    def test_load_from_event_loop(self):
+        call_command('load_physics_db', '--no-rules', stdout=StringIO())
+
+        async def load():
+            solver = SymbolicSolver()
+            solver.load_from_database(['mechanics'])
+            return solver
+
+        solver = asyncio.run(load())
+        self.assertIn('kessel', solver.equations)
+        # Rules derived from the database data were stored back through the ORM
+        self.assertTrue(RuleSet.objects.filter(domains='mechanics').exists())
+
+
+class CylinderApiTests(TransactionTestCase):
+    RUN = {'force': '100 kN', 'pressure': '200 bar', 'stroke': '500 mm', 'material_name': 'S355'}
+
+    def post(self, body):
+        return self.client.post('/api/cylinder/', json.dumps(body), content_type='application/json')
+
+    def test_invalid_runs_are_rejected(self):
+        for change in ({'material_name': ['S355']}, {'material_name': {'name': 'S355'}},
+                       {'material_name': 'Unobtainium'}, {'force': '-100 kN'}, {'safety_factor': 0}):
+            with self.subTest(change=change):
+                response = self.post({**self.RUN, **change})
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('error', response.json())
+
+    def test_non_finite_results_are_errors(self):
+        raw = {'bore_diameter': (float('nan'), 'millimeter'), 'wall_thickness': (3.4, 'millimeter')}
+        self.assertEqual(worker_pool.annotate(raw), {'error': 'Non-finite result for bore_diameter'})
+
+
+class MetricsViewTests(SimpleTestCase):
+    def test_metrics_endpoint(self):
+        metrics.enable()
+        self.addCleanup(metrics.disable)
+        self.addCleanup(metrics.reset)
+        solver = SymbolicSolver()
+        solver.load_from_database(DOMAINS, physics_db=PHYSICS_DB)
+        solver.solve_value('kessel', solver.equation_variables('kessel'),
+                           P=3e7, F=1e6, yield_strength=3.55e8, safety_factor=2.0)
+
+        response = self.client.get('/metrics/')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        body = response.content.decode()
+        self.assertIn('zylo_metrics_enabled 1', body)
+        self.assertIn('zylo_events_total{event="plan_cache_miss"}', body)
+        self.assertIn('zylo_phase_seconds_count{phase="kernel_eval"}', body)
+
+
+class GenerateSolverModuleTests(TestCase):
+    def test_generated_module_is_keyed_on_data_and_code(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        out = StringIO()
+        call_command('generate_solver_module', '--domains', 'geometry', '--no-workflow',
+                     '--output', str(Path(directory) / 'test_plans.py'), stdout=out)
+        self.assertIn('Wrote', out.getvalue())
+        sys.path.insert(0, directory)
+        self.addCleanup(sys.path.remove, directory)
+        self.addCleanup(sys.modules.pop, 'test_plans', None)
+        self.addCleanup(codegen.clear)
+
+        with mock.patch.dict(os.environ, {'ZYLO_GENERATED_PLANS': 'test_plans'}):
+            codegen.clear()
+            self.assertTrue(codegen.load_plans(['geometry'], PHYSICS_DB))
+            codegen.clear()
+            with mock.patch.object(codegen, '_code_digest', return_value='edited solver'), \
+                    self.assertLogs(level='WARNING'):
+                self.assertIsNone(codegen.load_plans(['geometry'], PHYSICS_DB))
+
+
+class WorkflowAsyncTests(TestCase):
+    def test_compiled_sizing_runs_inline(self):
+        self.addCleanup(result_cache.invalidate)
+        metrics.enable()
+        self.addCleanup(metrics.disable)
+        self.addCleanup(metrics.reset)
+        HydraulicCylinderWorkflow(100 * ureg.kN, 200 * ureg.bar, 500 * ureg.mm, 'S355', fast_units=True).run()
+        workflow = HydraulicCylinderWorkflow(120 * ureg.kN, 200 * ureg.bar, 500 * ureg.mm, 'S355', fast_units=True)
+        self.assertTrue(workflow.calc.solver.is_system_compiled(SIZING_EQUATIONS, workflow._sizing_inputs(), ['t', 'd']))
+
+        inline = metrics.snapshot()['counters'].get('async_inline', 0)
+        results = asyncio.run(workflow.run_async())
+        self.assertEqual(metrics.snapshot()['counters']['async_inline'], inline + 1)
+        self.assertEqual(results, workflow.run())
+
+
+class SweepTests(TestCase):
+    def test_quantity_arrays(self):
+        self.addCleanup(result_cache.invalidate)
+        rows = list(sweep.sweep(force=np.array([100, 150]) * ureg.kN, pressure=np.linspace(200, 300, 3) * ureg.bar,
+                                stroke=500 * ureg.mm, material_name='S355', processes=1))
+        self.assertEqual(len(rows), 6)
+        self.assertAlmostEqual(rows[1][0]['pressure'].to('bar').magnitude, 250)
+        self.assertAlmostEqual(rows[3][0]['force'].to('kN').magnitude, 150)
+        expected = HydraulicCylinderWorkflow(150 * ureg.kN, 200 * ureg.bar, 500 * ureg.mm, 'S355').run()
+        self.assertAlmostEqual(rows[3][1]['bore_diameter'].to('mm').magnitude,
+                               expected['bore_diameter'].to('mm').magnitude)
+
+
+class SolveSystemTests(SimpleTestCase):
+    def test_sizing_system_matches_closed_form(self):
+        solver = SymbolicSolver()
+        solver.load_from_database(DOMAINS, physics_db=PHYSICS_DB)
+        known = dict(P=3e7, F=1e6, yield_strength=3.55e8, safety_factor=2.0)
+        values = solver.solve_system_values(SIZING_EQUATIONS, known, ['t', 'd'])
+        bore = 2 * math.sqrt(known['F'] / known['P'] / math.pi)
+        self.assertAlmostEqual(values['d'], bore)
+        self.assertAlmostEqual(values['t'], known['P'] * bore * known['safety_factor'] / (2 * known['yield_strength']))
+
+        quantities = solver.solve_system(SIZING_EQUATIONS, {**known, 'P': 300 * ureg.bar}, ['t', 'd'])
+        self.assertAlmostEqual(quantities['d'].to('m').magnitude, values['d'])
+        plans = len(solver._plans)
+        solver.solve_system_values(SIZING_EQUATIONS, {**known, 'F': 2e6}, ['t', 'd'])
+        self.assertEqual(len(solver._plans), plans)
+
+
+class NumericBackendTests(SimpleTestCase):
+    def setUp(self):
+        self.solver = SymbolicSolver()
+        self.solver.load_from_database(DOMAINS, physics_db=PHYSICS_DB)
+
+    def test_backends_agree(self):
+        variables = self.solver.equation_variables('friction_factor_smooth')
+        expected = (0.316 / 0.02) ** 4
+        for backend in ('auto', 'numeric', 'symbolic'):
+            with self.subTest(backend=backend):
+                self.assertAlmostEqual(self.solver.solve_value('friction_factor_smooth', variables, backend=backend, f=0.02)
+                                       / expected, 1.0)
+
+    def test_implicit_diameter(self):
+        known = dict(delta_P=1e4, L=10.0, rho=1000.0, v=2.0, mu=1e-3)
+        diameter = self.solver.solve_value('pipe_pressure_drop', self.solver.equation_variables('pipe_pressure_drop'),
+                                           **known)
+        friction = 0.316 / (known['rho'] * known['v'] * diameter / known['mu']) ** 0.25
+        self.assertAlmostEqual(friction * known['L'] / diameter * known['rho'] * known['v'] ** 2 / 2 / known['delta_P'], 1.0)
+
+
+class LazyLoadTests(SimpleTestCase):
+    def test_lazy_matches_eager(self):
+        eager = SymbolicSolver()
+        eager.load_from_database(DOMAINS, physics_db=PHYSICS_DB)
+        lazy = SymbolicSolver()
+        lazy.load_from_database(DOMAINS, physics_db=PHYSICS_DB, lazy=True)
+        self.assertEqual(dict(lazy.equations), {})
+
+        self.assertEqual(lazy.solve_value('circle_area', lazy.equation_variables('circle_area'), r=0.1),
+                         eager.solve_value('circle_area', eager.equation_variables('circle_area'), r=0.1))
+        self.assertIn('circle_area', lazy.equations)
+        self.assertTrue(lazy._pending)
+
+        lazy._require(list(lazy._pending))
+        self.assertEqual(dict(lazy.equations), dict(eager.equations))
+        def rules(solver):
+            return {target: [{**rule, 'sources': sorted(rule['sources'])} for rule in target_rules]
+                    for target, target_rules in solver.substitution_rules.items()}
+
+        self.assertEqual(rules(lazy), rules(eager))
+
+
+class ExportTests(SimpleTestCase):
+    def test_round_trip(self):
+        rows = [{'force': (100 + i) * ureg.kN, 'material_name': 'S355' if i % 2 else 'Copper', 'safety_factor': 1.5,
+                 'bore_diameter': (80 + i) * ureg.mm} for i in range(10)]
+        rows[3] = {**rows[3], 'material_name': ''}
+        columns = {'force': 'kilonewton', 'material_name': str, 'safety_factor': float, 'bore_diameter': 'meter'}
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        for suffix in ('.csv', '.jsonl', '.zcol'):
+            with self.subTest(format=suffix):
+                path = Path(directory) / f'results{suffix}'
+                self.assertEqual(export.write_results(iter(rows), path, columns, chunk_size=4), len(rows))
+                reader = export.read_results(path, chunk_size=3)
+                self.assertEqual(reader.quantity('bore_diameter').units, ureg.meter)
+                for row, restored in zip(rows, reader.rows(), strict=True):
+                    self.assertEqual(restored.get('material_name', ''), row['material_name'])
+                    self.assertAlmostEqual(restored['bore_diameter'].to('mm').magnitude, row['bore_diameter'].magnitude)
+                    self.assertAlmostEqual(restored['force'].to('kN').magnitude, row['force'].magnitude)
+                    self.assertEqual(restored['safety_factor'], 1.5)
+
+
+class GradientTests(SimpleTestCase):
+    KNOWN = dict(P=3e7, F=1e6, yield_strength=3.55e8, safety_factor=2.0)
+
+    def setUp(self):
+        self.solver = SymbolicSolver()
+        self.solver.load_from_database(DOMAINS, physics_db=PHYSICS_DB)
+
+    def finite_difference(self, solve, name):
+        step = self.KNOWN[name] * 1e-6
+        return (solve({**self.KNOWN, name: self.KNOWN[name] + step})
+                - solve({**self.KNOWN, name: self.KNOWN[name] - step})) / (2 * step)
+
+    def test_gradient_through_substitutions(self):
+        variables = self.solver.equation_variables('kessel')
+        gradient = self.solver.gradient('kessel', variables, **self.KNOWN)
+        for name in self.KNOWN:
+            with self.subTest(wrt=name):
+                expected = self.finite_difference(lambda known: self.solver.solve_value('kessel', variables, **known), name)
+                self.assertAlmostEqual(gradient[name].to_base_units().magnitude / expected, 1.0, places=5)
+
+    def test_jacobian_of_sizing_system(self):
+        jacobian = self.solver.jacobian(SIZING_EQUATIONS, self.KNOWN, ['t', 'd'])
+        for target in ('t', 'd'):
+            for name in self.KNOWN:
+                with self.subTest(target=target, wrt=name):
+                    expected = self.finite_difference(
+                        lambda known: self.solver.solve_system_values(SIZING_EQUATIONS, known, ['t', 'd'])[target], name)
+                    self.assertAlmostEqual(jacobian[target][name].to_base_units().magnitude, expected,
+                                           delta=1e-6 * abs(expected) + 1e-15)
+
+
+class InvalidationTests(SimpleTestCase):
+    def test_add_substitution_rule_keeps_independent_plans(self):
+        solver = SymbolicSolver()
+        solver.load_from_database(DOMAINS, physics_db=PHYSICS_DB)
+        derived = dict(P=3e7, F=1e6, yield_strength=3.55e8, safety_factor=2.0)
+        given = dict(P=3e7, d=0.2, sigma_allow=1.775e8)
+        kessel = solver.equation_variables('kessel')
+        before = solver.solve_value('kessel', kessel, **derived)
+        solver.solve_value('kessel', kessel, **given)
+        solver.solve_value('circle_area', solver.equation_variables('circle_area'), r=0.1)
+
+        def compiled(name, known):
+            return any(key[0] == name and key[1] == frozenset(known) for key in solver._plans)
+
+        symbols = {name: solver.symbols[name] for name in ('yield_strength', 'safety_factor')}
+        solver.add_substitution_rule('sigma_allow', ['yield_strength', 'safety_factor'],
+                                     symbols['yield_strength'] / (2 * symbols['safety_factor']), priority=100)
+        # Derives sigma_allow: dropped; sigma_allow known or not involved: kept
+        self.assertFalse(compiled('kessel', derived))
+        self.assertTrue(compiled('kessel', given))
+        self.assertTrue(compiled('circle_area', {'r'}))
+        self.assertAlmostEqual(solver.solve_value('kessel', kessel, **derived), 2 * before)
+
+
+class ThreadSafetyTests(SimpleTestCase):
+    THREADS = 8
+    ROUNDS = 3
+
+    def test_shared_solver_under_mutation(self):
+        reference_solver = SymbolicSolver()
+        reference_solver.load_from_database(DOMAINS, physics_db=PHYSICS_DB)
+        work = []
+        for name in ('kessel', 'sigma_allow', 'force', 'circle_area', 'diameter'):
+            variables = reference_solver.equation_variables(name)
+            for target in variables:
+                known = {var: 1.5 + 0.25 * i for i, var in enumerate(variables) if var != target}
+                work.append(lambda s, name=name, known=known: s.solve_value(name, s.equation_variables(name), **known))
+        sizing = dict(P=3e7, F=1e6, yield_strength=3.55e8, safety_factor=2.0)
+        work.append(lambda s: s.solve_system_values(SIZING_EQUATIONS, sizing, ['t', 'd']))
+
+        def outcome(call, solver):
+            try:
+                return call(solver)
+            except Exception as e:
+                return type(e).__name__
+
+        reference = [outcome(call, reference_solver) for call in work]
+        solver = reference_solver.copy()
+        solver.add_symbols({'stress_load': {}})
+        barrier = threading.Barrier(self.THREADS + 1)
+        stop = threading.Event()
+        failures = []
+
+        def reader(index):
+            order = list(range(len(work))) * self.ROUNDS
+            random.Random(index).shuffle(order)
+            barrier.wait()
+            for i in order:
+                result = outcome(work[i], solver)
+                if result != reference[i] and not (isinstance(result, dict) and result.keys() == reference[i].keys()
+                                                   and all(math.isclose(result[k], reference[i][k]) for k in result)):
+                    failures.append((i, result, reference[i]))
+
+        def writer():
+            barrier.wait()
+            while not stop.is_set():
+                solver.add_equation_incremental('stress_extra', 'stress_load = F / A')
+                solver.remove_equation('stress_extra')
+
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-5)
+        self.addCleanup(sys.setswitchinterval, interval)
+        readers = [threading.Thread(target=reader, args=(i,)) for i in range(self.THREADS)]
+        mutator = threading.Thread(target=writer)
+        for thread in readers + [mutator]:
+            thread.start()
+        for thread in readers:
+            thread.join()
+        stop.set()
+        mutator.join()
+        self.assertEqual(failures, [])
+
+
+class WithoutDjangoTests(SimpleTestCase):
+    SCRIPT = '''
+import asyncio
+from zylo.core.data.materials_db import MATERIALS_DB, materials
+from zylo.core.data.materials_table import materials_table
+from zylo.core.physics.conversions import ureg
+from zylo.core.physics.mechanics import mechanics
+from zylo.core.workflow.hydraulic_cylinder_workflow import HydraulicCylinderWorkflow
+
+async def main():
+    assert materials() is MATERIALS_DB
+    area = await mechanics('async').solve_async('circle_area', r=0.1 * ureg.m)
+    results = await HydraulicCylinderWorkflow(100 * ureg.kN, 200 * ureg.bar, 500 * ureg.mm, 'S355').run_async()
+    print(round(area.to('m**2').magnitude, 6), round(results['bore_diameter'].to('mm').magnitude, 3))
+
+asyncio.run(main())
+'''
+
+    def test_first_load_inside_event_loop(self):
+        # A plain script: no settings, so every loader falls back to the in-code data
+        env = {key: value for key, value in os.environ.items() if key != 'DJANGO_SETTINGS_MODULE'}
+        env['PYTHONPATH'] = str(Path(__file__).resolve().parents[2])
+        result = subprocess.run([sys.executable, '-c', self.SCRIPT], env=env, cwd=tempfile.gettempdir(),
+                                capture_output=True, text=True, timeout=300)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(result.stdout.split(), ['0.031416', '79.788'])
+
+
+class ProcessExecutorTests(TestCase):
+    def test_async_work_runs_in_processes(self):
+        # Spawned workers start without the test's settings and load the in-code data
+        executor = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn'))
+        self.addCleanup(executor.shutdown)
+        self.addCleanup(result_cache.invalidate)
+        result_cache.invalidate()
+        calc = mechanics('async', fast_units=True)
+        kessel = dict(P=300 * ureg.bar, F=1000 * ureg.kN, yield_strength=355 * ureg.MPa, safety_factor=2.0)
+        workflow = HydraulicCylinderWorkflow(100 * ureg.kN, 250 * ureg.bar, 500 * ureg.mm, 'S355', fast_units=True)
+
+        async def run():
+            return (await calc.solve_async('kessel', executor=executor, **kessel),
+                    await workflow.run_async(executor=executor))
+
+        thickness, results = asyncio.run(run())
+        self.assertAlmostEqual(thickness.to('mm').magnitude, calc.solve('kessel', **kessel).to('mm').magnitude)
+        for name, value in workflow.run().items():
+            self.assertAlmostEqual(results[name].to(value.units).magnitude, value.magnitude)
+
+        calc.solver = calc.solver.copy()
+        with self.assertRaisesRegex(TypeError, 'thread executor'):
+            asyncio.run(calc.solve_async('circle_area', executor=executor, r=0.1 * ureg.m))
+
+
+class ResultCacheTests(SimpleTestCase):
+    def test_lru_eviction_and_stats(self):
+        cache = result_cache.LRUCache('test', maxsize=2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        self.assertEqual(cache.get('a'), 1)
+        cache.put('c', 3)
+        self.assertIsNone(cache.get('b', None))
+        self.assertEqual((cache.get('a'), cache.get('c')), (1, 3))
+        self.assertEqual(cache.stats(), {'hits': 3, 'misses': 1, 'hit_rate': 0.75, 'evictions': 1, 'size': 2,
+                                         'maxsize': 2, 'ttl': None})
+        cache.clear()
+        self.assertIsNone(cache.get('a', None))
+        self.assertEqual(cache.stats()['size'], 0)
+
+    def test_ttl_expiry(self):
+        cache = result_cache.LRUCache('test', ttl=10)
+        with mock.patch('time.monotonic', return_value=100.0):
+            cache.put('a', 1)
+        with mock.patch('time.monotonic', return_value=109.0):
+            self.assertEqual(cache.get('a'), 1)
+        with mock.patch('time.monotonic', return_value=111.0):
+            self.assertIsNone(cache.get('a', None))
+        self.assertEqual(cache.stats()['size'], 0)
+
+    def test_disabled_cache_stores_nothing(self):
+        cache = result_cache.LRUCache('test', maxsize=0)
+        cache.put('a', 1)
+        self.assertIsNone(cache.get('a', None))
+
+
+class MemoizationTests(TestCase):
+    KESSEL = dict(P=300 * ureg.bar, F=1000 * ureg.kN, yield_strength=355 * ureg.MPa, safety_factor=2.0)
+
+    def setUp(self):
+        result_cache.invalidate()
+        self.addCleanup(result_cache.invalidate)
+
+    def stats(self):
+        return {name: result_cache.SOLVE_CACHE.stats()[name] for name in ('hits', 'misses')}
+
+    def test_solve_is_memoized_until_reload(self):
+        result_cache.SOLVE_CACHE.hits = result_cache.SOLVE_CACHE.misses = 0
+        first = mechanics().solve('kessel', **self.KESSEL)
+        self.assertIs(mechanics().solve('kessel', **{**self.KESSEL, 'P': 30 * ureg.MPa}), first)
+        self.assertEqual(self.stats(), {'hits': 1, 'misses': 1})
+        result_cache.invalidate()
+        self.assertIsNot(mechanics().solve('kessel', **self.KESSEL), first)
+
+    def test_registry_reload_changes_keys(self):
+        calc = mechanics()
+        first = calc.solve('kessel', **self.KESSEL)
+        solver_registry.clear()
+        # The old snapshot's entries are never served to a calculator on the reloaded solver
+        self.assertIsNot(mechanics().solve('kessel', **self.KESSEL), first)
+        self.assertIs(calc.solve('kessel', **self.KESSEL), first)
+
+    def test_workflow_is_memoized_until_invalidated(self):
+        workflow = HydraulicCylinderWorkflow(100 * ureg.kN, 250 * ureg.bar, 500 * ureg.mm, 'S355')
+        first = workflow.run()
+        self.assertEqual(HydraulicCylinderWorkflow(100 * ureg.kN, 25 * ureg.MPa, 0.5 * ureg.m, 'S355').run(), first)
+        self.assertEqual(result_cache.WORKFLOW_CACHE.stats()['size'], 1)
+        result_cache.invalidate()
+        self.assertEqual(result_cache.WORKFLOW_CACHE.stats()['size'], 0)
+
+    def test_async_miss_is_counted_once(self):
+        result_cache.SOLVE_CACHE.hits = result_cache.SOLVE_CACHE.misses = 0
+        calc = mechanics()
+        asyncio.run(calc.solve_async('kessel', **self.KESSEL))
+        self.assertEqual(self.stats(), {'hits': 0, 'misses': 1})
+        asyncio.run(calc.solve_async('kessel', **self.KESSEL))
+        self.assertEqual(self.stats(), {'hits': 1, 'misses': 1})
+
+    def test_default_path_does_not_check_dimensions(self):
+        # As before memoization: only fast_units checks dimensions
+        self.assertAlmostEqual(mechanics().solve('circle_area', r=0.1 * ureg.s).magnitude, math.pi * 0.01)
+        with self.assertRaises(pint.DimensionalityError):
+            mechanics(fast_units=True).solve('circle_area', r=0.1 * ureg.s)
+
+
+class CylinderOptimizerTests(TestCase):
+    MATERIALS = ['S355', 'Aluminum_6061_T6']
+    SAFETY_FACTORS = (1.5, 2.0)
+    RANGE = (50 * ureg.bar, 4000 * ureg.bar)
+
+    def test_pareto_mask(self):
+        objectives = np.array([[1.0, 5.0], [2.0, 3.0], [2.0, 4.0], [3.0, 3.0], [4.0, 1.0], [1.0, 6.0]])
+        self.assertEqual(cylinder_optimizer.pareto_mask(objectives).tolist(), [True, True, False, False, True, False])
+
+    def test_od_optimum(self):
+        table = materials_table().select(self.MATERIALS)
+        optimal = cylinder_optimizer._od_optimal_pressures(table['yield_strength'], np.array(self.SAFETY_FACTORS),
+                                                           *(p.to('Pa').magnitude for p in self.RANGE))
+        grid = np.linspace(50e5, 4000e5, 4001)
+        for m, name in enumerate(self.MATERIALS):
+            for k, safety_factor in enumerate(self.SAFETY_FACTORS):
+                outer = HydraulicCylinderWorkflow.run_batch(
+                    100 * ureg.kN, grid * ureg.Pa, 500 * ureg.mm, materials()[name]['yield_strength'],
+                    materials()[name]['density'], safety_factor)['outer_diameter'].magnitude
+                with self.subTest(material=name, safety_factor=safety_factor):
+                    self.assertAlmostEqual(optimal[m, k] / grid[np.argmin(outer)], 1.0, delta=1e-3)
+
+    def test_front_is_the_non_dominated_set(self):
+        designs = cylinder_optimizer.optimize_cylinder(100 * ureg.kN, 500 * ureg.mm, self.RANGE, self.MATERIALS,
+                                                       self.SAFETY_FACTORS, n_pressures=15)
+        candidates = []
+        for name in self.MATERIALS:
+            for safety_factor in self.SAFETY_FACTORS:
+                for pressure in [*np.linspace(50, 4000, 15), None]:
+                    if pressure is None:
+                        sigma_allow = materials()[name]['yield_strength'].to('bar').magnitude / safety_factor
+                        pressure = min(max(sigma_allow, 50), 4000)
+                    results = HydraulicCylinderWorkflow(100 * ureg.kN, pressure * ureg.bar, 500 * ureg.mm, name,
+                                                        safety_factor).run()
+                    candidates.append((results['pipe_wall_mass'].to('kg').magnitude,
+                                       results['outer_diameter'].to('mm').magnitude))
+        front = [(mass, outer) for mass, outer in candidates
+                 if not any(m <= mass and o <= outer and (m, o) != (mass, outer) for m, o in candidates)]
+        self.assertEqual(len(designs), len(front))
+        masses = [design['pipe_wall_mass'].to('kg').magnitude for design in designs]
+        self.assertEqual(masses, sorted(masses))
+        for design, (mass, outer) in zip(designs, sorted(front)):
+            self.assertAlmostEqual(design['pipe_wall_mass'].to('kg').magnitude, mass)
+            self.assertAlmostEqual(design['outer_diameter'].to('mm').magnitude, outer)
+
+
+class FastUnitsTests(TestCase):
+    def test_fast_units_match_for_every_material(self):
+        # Both paths share a memoization key, so compute each run instead of reading it back
+        self.enterContext(mock.patch.object(result_cache.WORKFLOW_CACHE, 'maxsize', 0))
+        for name in materials():
+            with self.subTest(material=name):
+                reference = HydraulicCylinderWorkflow(100 * ureg.kN, 200 * ureg.bar, 500 * ureg.mm, name).run()
+                fast = HydraulicCylinderWorkflow(100 * ureg.kN, 200 * ureg.bar, 500 * ureg.mm, name,
+                                                 fast_units=True).run()
+                self.assertEqual(fast, reference)
+                self.assertEqual({key: value.magnitude for key, value in fast.items()},
+                                 {key: value.magnitude for key, value in reference.items()})
+
+
+class SolveBatchTests(SimpleTestCase):
+    SIZING = dict(yield_strength=355 * ureg.megapascal, safety_factor=2.0)
+    PIPE = dict(L=10 * ureg.meter, rho=1000 * ureg('kg/m^3'), v=2 * ureg('m/s'), mu=1e-3 * ureg('Pa*s'))
+
+    def setUp(self):
+        self.solver = SymbolicSolver()
+        self.solver.load_from_database(DOMAINS, physics_db=PHYSICS_DB)
+
+    def test_broadcast_grid_matches_scalar_solve(self):
+        variables = self.solver.equation_variables('kessel')
+        pressures, forces = np.array([100.0, 250.0]), np.array([100.0, 200.0, 300.0, 400.0])
+        thickness = self.solver.solve_batch('kessel', variables, P=pressures[:, None] * ureg.bar,
+                                            F=forces * ureg.kilonewton, **self.SIZING)
+        self.assertEqual(thickness.shape, (2, 4))
+        self.assertEqual(thickness.units, ureg.meter)
+        for (i, j), value in np.ndenumerate(thickness.magnitude):
+            with self.subTest(P=pressures[i], F=forces[j]):
+                expected = self.solver.solve_value('kessel', variables, P=pressures[i] * 1e5, F=forces[j] * 1e3,
+                                                   yield_strength=3.55e8, safety_factor=2.0)
+                self.assertAlmostEqual(value / expected, 1.0)
+
+    def test_rows_without_solution_are_nan(self):
+        thickness = self.solver.solve_batch('kessel', self.solver.equation_variables('kessel'),
+                                            P=np.array([[100.0], [-200.0]]) * ureg.bar,
+                                            F=np.array([100.0, 200.0, 300.0]) * ureg.kilonewton, **self.SIZING)
+        self.assertTrue(np.isfinite(thickness.magnitude[0]).all())
+        self.assertTrue(np.isnan(thickness.magnitude[1]).all())
+
+        variables = self.solver.equation_variables('pipe_pressure_drop')
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            diameters = self.solver.solve_batch('pipe_pressure_drop', variables,
+                                                delta_P=np.array([1e4, -1e4]) * ureg.pascal, **self.PIPE)
+        expected = self.solver.solve_value('pipe_pressure_drop', variables, delta_P=1e4, L=10.0, rho=1000.0,
+                                           v=2.0, mu=1e-3)
+        self.assertAlmostEqual(diameters.magnitude[0] / expected, 1.0)
+        self.assertTrue(np.isnan(diameters.magnitude[1]))
+
+    def test_empty_input(self):
+        thickness = self.solver.solve_batch('kessel', self.solver.equation_variables('kessel'),
+                                            P=[] * ureg.bar, F=1000 * ureg.kilonewton, **self.SIZING)
+        self.assertEqual(thickness.shape, (0,))
+        self.assertEqual(thickness.units, ureg.meter)
+        diameters = self.solver.solve_batch('pipe_pressure_drop', self.solver.equation_variables('pipe_pressure_drop'),
+                                            delta_P=[] * ureg.pascal, **self.PIPE)
+        self.assertEqual(diameters.shape, (0,))
+
+
+class UncertaintyTests(TestCase):
+    def setUp(self):
+        self.workflow = HydraulicCylinderWorkflow(1000 * ureg.kilonewton, 300 * ureg.bar, 1 * ureg.meter, 'S355', 2.0)
+
+    def test_zero_width_distributions_reproduce_run(self):
+        summary = self.workflow.run_uncertainty({
+            'pressure': uncertainty.Normal(std=0 * ureg.bar),
+            'yield_strength': uncertainty.LogNormal(cov=0.0),
+            'wall_thickness': uncertainty.Tolerance(0 * ureg.millimeter, 0 * ureg.millimeter),
+        }, samples=100, seed=1)
+        self.assertEqual(summary['invalid'], 0)
+        for name, value in self.workflow.run().items():
+            for level, percentile in summary['percentiles'][name].items():
+                with self.subTest(output=name, percentile=level):
+                    self.assertAlmostEqual((percentile / value).to('dimensionless').magnitude, 1.0, places=12)
+        for percentile in summary['percentiles']['utilization'].values():
+            self.assertAlmostEqual(percentile.magnitude, 1.0, places=12)
+
+    def test_seeded_percentiles(self):
+        distributions = {
+            'pressure': uncertainty.Normal(std=10 * ureg.bar),
+            'yield_strength': uncertainty.LogNormal(cov=0.07),
+            'wall_thickness': uncertainty.Tolerance(-0.2 * ureg.millimeter, 0.2 * ureg.millimeter),
+        }
+        summary = self.workflow.run_uncertainty(distributions, samples=10_000, percentiles=(5, 50, 95), seed=1)
+        self.assertEqual(summary, self.workflow.run_uncertainty(distributions, samples=10_000,
+                                                                percentiles=(5, 50, 95), seed=1))
+        for name, percentiles in summary['percentiles'].items():
+            with self.subTest(output=name):
+                low, median, high = (percentiles[level].magnitude for level in (5, 50, 95))
+                self.assertLessEqual(low, median)
+                self.assertLessEqual(median, high)
+        self.assertLess(summary['percentiles']['wall_thickness'][5].magnitude,
+                        summary['percentiles']['wall_thickness'][95].magnitude)
+        self.assertTrue(0 < summary['violation_probability'] < 1)
+
+
+class MaterialsTableTests(TestCase):
+    def test_table_matches_catalog(self):
+        catalog, table = materials(), materials_table()
+        self.assertEqual(table.names, list(catalog))
+        self.assertEqual(set(table.columns), {prop for data in catalog.values() for prop in data})
+        for name, data in catalog.items():
+            row = table.row(name)
+            self.assertEqual(set(row), set(data))
+            for prop, value in data.items():
+                with self.subTest(material=name, property=prop):
+                    if isinstance(value, str):
+                        self.assertEqual(row[prop], value)
+                    else:
+                        expected = ureg.Quantity(value).to_base_units().magnitude
+                        self.assertAlmostEqual(table[prop][table.index[name]] / expected, 1.0, places=12)
+
+    def test_batch_over_columns_matches_run(self):
+        self.enterContext(mock.patch.object(result_cache.WORKFLOW_CACHE, 'maxsize', 0))
+        table = materials_table()
+        force, pressure, stroke = 100 * ureg.kN, 200 * ureg.bar, 500 * ureg.mm
+        batch = HydraulicCylinderWorkflow.run_batch(force, pressure, stroke, table.quantity('yield_strength'),
+                                                    table.quantity('density'), safety_factor=2.0)
+        # Outputs that do not depend on the material (the bore) come back unbroadcast
+        columns = {output: np.broadcast_to(value.magnitude, (len(table),)) for output, value in batch.items()}
+        for i, name in enumerate(table.names):
+            for output, value in HydraulicCylinderWorkflow(force, pressure, stroke, name, 2.0).run().items():
+                with self.subTest(material=name, output=output):
+                    self.assertEqual(batch[output].units, value.units)
+                    self.assertAlmostEqual(columns[output][i] / value.magnitude, 1.0, places=12)
+
+
+class RuleCacheTests(SimpleTestCase):
+    def test_payload_round_trip(self):
+        solver = SymbolicSolver()
+        solver.load_from_database(list(PHYSICS_DB['domains']), use_cache=False, physics_db=PHYSICS_DB)
+        payload = rule_cache.make_payload('k', solver.equations, solver.substitution_rules,
+                                          solver.auto_detector.equation_metadata)
+        restored = rule_cache.loads(rule_cache.dumps(payload))
+        self.assertEqual(restored['equations'], dict(solver.equations))
+        self.assertEqual(restored['substitution_rules'],
+                         {target: [dict(rule) for rule in rules] for target, rules in solver.substitution_rules.items()})
+
+    def test_key_covers_solver_source(self):
+        key = rule_cache.cache_key(['geometry'])
+        rule_cache._code_digest.cache_clear()
+        self.addCleanup(rule_cache._code_digest.cache_clear)
+        solver_source = Path(rule_cache.__file__).with_name('symbolic_solver.py')
+        edited = solver_source.read_bytes() + b'\n# edited\n'
+        with mock.patch.object(Path, 'read_bytes', lambda path: edited if path == solver_source
+                               else open(path, 'rb').read()):
+            self.assertNotEqual(rule_cache.cache_key(['geometry']), key)
+
+    def test_unknown_nodes_are_rejected(self):
+        text = ('{"key": "k", "symbols": {}, "equations": {"x": ["system", ["Integer", 1]]}, '
+                '"substitution_rules": {}, "equation_metadata": {}}')
+        with self.assertRaises(KeyError):
+            rule_cache.loads(text)
@@ -3,4 +3,6 @@ from . import views
 
 urlpatterns = [
     path('', views.home, name='home'),
+    path('metrics/', views.metrics, name='metrics'),
+    path('api/cylinder/', views.cylinder_sizing, name='cylinder_sizing'),
 ]
\ No newline at end of file
@@ -1,7 +1,41 @@
+import json
+
 from django.shortcuts import render
-from django.http import HttpResponse
+from django.http import HttpResponse, JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
 
 # Create your views here.
 
 def home(request):
-   return render(request, 'core/home.html') 
\ No newline at end of file
+   return render(request, 'core/home.html')
+
+def metrics(request):
+   """Solver and workflow timings/counters in the Prometheus text format."""
+   from zylo.core import metrics as solver_metrics
+   return HttpResponse(solver_metrics.render_prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+@csrf_exempt
+@require_POST
+async def cylinder_sizing(request):
+   """Size hydraulic cylinders on the warm worker pool.
+
+   Body: one run object, or {"runs": [...]} for a batch. Each run has force, pressure,
+   stroke (e.g. "300 bar" or {"value": 300, "units": "bar"}), material_name and an
+   optional safety_factor. Returns {"results": [...]} with unit-annotated values; if a
+   run has no valid finite solution the status is 400 and its result holds the error.
+   """
+   from zylo.core.workflow import worker_pool
+   try:
+      body = json.loads(request.body)
+      runs = body['runs'] if isinstance(body, dict) and 'runs' in body else [body]
+      if not isinstance(runs, list) or not 0 < len(runs) <= worker_pool.MAX_BATCH:
+         raise ValueError(f"'runs' must be a list of 1 to {worker_pool.MAX_BATCH} runs")
+      points = [worker_pool.parse_point(run) for run in runs]
+   except (json.JSONDecodeError, ValueError) as e:
+      return JsonResponse({'error': str(e)}, status=400)
+   results = [worker_pool.annotate(raw) for raw in await worker_pool.run_points(points)]
+   failed = [i for i, result in enumerate(results) if 'error' in result]
+   if failed:
+      return JsonResponse({'error': f"No valid solution for runs {failed}", 'results': results}, status=400)
+   return JsonResponse({'results': results})
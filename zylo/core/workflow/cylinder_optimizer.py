@@ -0,0 +1,100 @@
+"""
+Multi-objective material and pressure selection for hydraulic cylinders.
+
+Searches materials x operating pressure x safety factor and returns the designs
+on the Pareto front of pipe wall mass versus outer diameter. All grid points are
+evaluated in one vectorized HydraulicCylinderWorkflow.run_batch call.
+
+For a fixed material the bore is d = sqrt(4F/(pi P)) and the wall t = P d /
+(2 sigma_allow) (the force, circle_area and kessel equations), so the outer
+diameter d + 2t = d (1 + P/sigma_allow) has its single minimum at
+P = sigma_allow, while the wall mass grows with pressure. That pressure, clipped
+to the range, is added to the grid for every material and safety factor so the
+end of each material's front is exact rather than grid-limited.
+"""
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from zylo.core.physics.conversions import ureg
+from zylo.core.data.materials_table import materials_table
+from zylo.core.physics.mechanics import mechanics
+from zylo.core.workflow.hydraulic_cylinder_workflow import HydraulicCylinderWorkflow
+
+
+def pareto_mask(objectives: np.ndarray) -> np.ndarray:
+    """Boolean mask of non-dominated rows of an (n, 2) array, both objectives minimized."""
+    order = np.lexsort((objectives[:, 1], objectives[:, 0]))
+    second = objectives[order, 1]
+    best_before = np.minimum.accumulate(np.concatenate(([np.inf], second[:-1])))
+    mask = np.zeros(len(objectives), dtype=bool)
+    mask[order] = second < best_before
+    return mask
+
+
+def optimize_cylinder(force, stroke, pressure_range: Tuple, materials: Sequence[str] = None,
+                      safety_factors: Sequence[float] = (1.5,), n_pressures: int = 200) -> List[Dict]:
+    """Pareto-optimal designs (pipe wall mass vs. outer diameter).
+
+    Args:
+        force: Required force Quantity.
+        stroke: Stroke length Quantity.
+        pressure_range: (min, max) operating pressure Quantities.
+        materials: MATERIALS_DB names to consider; defaults to the whole catalog.
+        safety_factors: Candidate safety factors.
+        n_pressures: Number of grid pressures per material and safety factor.
+
+    Returns:
+        Non-dominated designs sorted by increasing mass, each a dict with the design
+        inputs and the workflow results.
+    """
+    table = materials_table()
+    if materials is not None:
+        table = table.select(materials)
+    materials = table.names
+    p_min, p_max = (p.to(ureg.pascal).magnitude for p in pressure_range)
+    safety_factors = np.asarray(safety_factors, dtype=float)
+    yield_strength = table['yield_strength']
+    density = table['density']
+
+    # Grid shape: (material, pressure, safety factor)
+    pressures = np.linspace(p_min, p_max, n_pressures)
+    pressures = np.broadcast_to(pressures, (len(materials), len(safety_factors), n_pressures))
+    od_optimal = _od_optimal_pressures(yield_strength, safety_factors, p_min, p_max)
+    pressures = np.concatenate([pressures, od_optimal[..., np.newaxis]], axis=2).transpose(0, 2, 1)
+
+    results = HydraulicCylinderWorkflow.run_batch(
+        force=force,
+        pressure=pressures * ureg.pascal,
+        stroke=stroke,
+        yield_strength=yield_strength[:, np.newaxis, np.newaxis] * ureg.pascal,
+        density=density[:, np.newaxis, np.newaxis] * ureg.kilogram / ureg.meter**3,
+        safety_factor=safety_factors[np.newaxis, np.newaxis, :],
+    )
+    mass = results['pipe_wall_mass'].to(ureg.kilogram).magnitude.ravel()
+    outer = results['outer_diameter'].to(ureg.millimeter).magnitude.ravel()
+    valid = np.isfinite(mass) & np.isfinite(outer)
+    candidates = np.flatnonzero(valid)
+    front = candidates[pareto_mask(np.column_stack((mass[candidates], outer[candidates])))]
+    front = front[np.argsort(mass[front])]
+
+    designs = []
+    for m, p, k in zip(*np.unravel_index(front, pressures.shape)):
+        designs.append({
+            'material_name': materials[m],
+            'pressure': (pressures[m, p, k] * ureg.pascal).to(ureg.bar),
+            'safety_factor': float(safety_factors[k]),
+            **{name: values[m, p, k] for name, values in results.items()},
+        })
+    return designs
+
+
+def _od_optimal_pressures(yield_strength: np.ndarray, safety_factors: np.ndarray,
+                          p_min: float, p_max: float) -> np.ndarray:
+    """Pressure minimizing the outer diameter for every (material, safety factor) pair."""
+    sigma_allow = mechanics("Cylinder optimizer").solve_batch(
+        'sigma_allow',
+        yield_strength=yield_strength[:, np.newaxis] * ureg.pascal,
+        safety_factor=safety_factors[np.newaxis, :],
+    ).to(ureg.pascal).magnitude
+    return np.clip(sigma_allow, p_min, p_max)
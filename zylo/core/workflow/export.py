@@ -0,0 +1,397 @@
+"""
+Streaming export of workflow results to CSV, JSONL and a binary columnar format.
+
+Rows are dicts like HydraulicCylinderWorkflow.run() returns: Quantities plus
+plain numbers and strings such as the material name. Writers consume any row
+iterator in chunks of `chunk_size` rows, so memory stays constant however many
+rows a sweep produces. Each column has one unit, written once in the header,
+and values are converted to it on the way out:
+
+    columns = {'force': 'kilonewton', 'material_name': str, 'safety_factor': float,
+               **HydraulicCylinderWorkflow.RESULT_UNITS}
+    write_results(({**inputs, **outputs} for inputs, outputs in sweep(...)), 'sweep.zcol', columns)
+
+    reader = read_results('sweep.zcol')
+    for chunk in reader.chunks():       # {name: ndarray}; views into the mapped file for .zcol
+        ...
+    for row in reader.rows():           # dicts of Quantities again
+        ...
+
+The format follows the file extension (.csv, .jsonl, .zcol) unless given.
+
+A column spec is a unit (Quantity column), `float` (plain numbers, stored as
+dimensionless) or `str` (text). Without `columns` the schema comes from the
+first row, and later rows with other keys raise ValueError. Missing values are
+NaN in numeric columns and '' in text columns, and are left out of `rows()`.
+
+Columnar layout (.zcol, little endian): the magic b'ZYLOCOL1'; one row group
+per chunk, each column stored contiguously as float64, or for text as int32
+codes into a per-column string table (-1 = missing), padded to 8 bytes; a JSON
+footer with the schema, row group offsets and string tables; the footer length
+as uint64 and the magic again.
+"""
+import csv
+import functools
+import itertools
+import json
+import os
+import re
+import struct
+from typing import IO, Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Union
+
+import numpy as np
+
+from zylo.core.physics.conversions import ureg, si_conversion
+
+CHUNK_SIZE = 4096
+FORMATS = {'.csv': 'csv', '.jsonl': 'jsonl', '.zcol': 'columnar'}
+MAGIC = b'ZYLOCOL1'
+DIMENSIONLESS = str(ureg.dimensionless)
+_HEADER = re.compile(r'^(.*) \[(.*)\]$')
+
+Target = Union[str, os.PathLike, IO]
+
+
+class Column(NamedTuple):
+    name: str
+    # Unit of the stored magnitudes; None for text columns
+    unit: Optional[str]
+
+    @classmethod
+    def from_spec(cls, name: str, spec) -> 'Column':
+        if spec is str:
+            return cls(name, None)
+        if spec is float:
+            return cls(name, DIMENSIONLESS)
+        return cls(name, str(ureg.Unit(spec)))
+
+
+def schema(columns: Dict[str, Any]) -> List[Column]:
+    """Columns from a {name: unit | float | str} mapping."""
+    return [Column.from_spec(name, spec) for name, spec in columns.items()]
+
+
+def infer_schema(row: Dict[str, Any]) -> List[Column]:
+    """Columns for the keys of `row`, in the units its values have."""
+    return [Column(name, str(value.units)) if isinstance(value, ureg.Quantity)
+            else Column(name, None if isinstance(value, str) else DIMENSIONLESS)
+            for name, value in row.items()]
+
+
+@functools.lru_cache(maxsize=None)
+def _factor(from_units, to_units: str) -> Optional[float]:
+    """Multiplier from `from_units` to `to_units`; None if it needs a full conversion."""
+    (from_factor, from_dims), (to_factor, to_dims) = si_conversion(from_units), si_conversion(to_units)
+    if from_factor is None or to_factor is None or from_dims != to_dims:
+        return None
+    return from_factor / to_factor
+
+
+def _magnitudes(values: List, column: Column) -> np.ndarray:
+    out = np.full(len(values), np.nan)
+    for i, value in enumerate(values):
+        if value is None:
+            continue
+        if isinstance(value, ureg.Quantity):
+            factor = _factor(value.units, column.unit)
+            value = value.magnitude * factor if factor is not None else value.to(column.unit).magnitude
+        elif column.unit != DIMENSIONLESS:
+            raise ValueError(f"Column '{column.name}' needs a Quantity in {column.unit}, got {value!r}")
+        out[i] = value
+    return out
+
+
+def to_columns(rows: List[Dict[str, Any]], columns: List[Column]) -> Dict[str, np.ndarray]:
+    """One chunk of rows as {name: array} in the column units."""
+    names = {column.name for column in columns}
+    for row in rows:
+        if not row.keys() <= names:
+            raise ValueError(f"Row has columns missing from the schema: {sorted(row.keys() - names)}")
+    return {column.name: np.array(['' if row.get(column.name) is None else str(row[column.name]) for row in rows],
+                                  dtype=object)
+            if column.unit is None else _magnitudes([row.get(column.name) for row in rows], column)
+            for column in columns}
+
+
+def _format(target, format: Optional[str]) -> str:
+    if format is not None:
+        if format not in FORMATS.values():
+            raise ValueError(f"Unknown format '{format}'; expected one of {sorted(FORMATS.values())}")
+        return format
+    name = os.fspath(target) if isinstance(target, (str, os.PathLike)) else getattr(target, 'name', '')
+    suffix = os.path.splitext(str(name))[1].lower()
+    if suffix not in FORMATS:
+        raise ValueError(f"Cannot tell the format of {target!r}; pass format= one of {sorted(FORMATS.values())}")
+    return FORMATS[suffix]
+
+
+class ResultWriter:
+    """Streams rows to `target` (a path or an open file, which is left open) one chunk at a time."""
+    binary = False
+
+    def __init__(self, target: Target, columns: Dict[str, Any] = None, chunk_size: int = CHUNK_SIZE):
+        self.columns = schema(columns) if columns is not None else None
+        self.chunk_size = chunk_size
+        self.rows_written = 0
+        self._owned = not hasattr(target, 'write')
+        if self._owned:
+            self.file = open(target, 'wb') if self.binary else open(target, 'w', newline='', encoding='utf-8')
+        else:
+            self.file = target
+        self._started = False
+
+    def write(self, rows: Iterable[Dict[str, Any]]) -> int:
+        """Write all rows of an iterable; returns the total number of rows written so far."""
+        rows = iter(rows)
+        for chunk in iter(lambda: list(itertools.islice(rows, self.chunk_size)), []):
+            if self.columns is None:
+                self.columns = infer_schema(chunk[0])
+            self._start()
+            self._write_chunk(to_columns(chunk, self.columns), len(chunk))
+            self.rows_written += len(chunk)
+        return self.rows_written
+
+    def close(self):
+        if self.columns is None:
+            self.columns = []
+        self._start()
+        self._finish()
+        if self._owned:
+            self.file.close()
+        else:
+            self.file.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _start(self):
+        if not self._started:
+            self._started = True
+            self._write_header()
+
+    def _write_header(self):
+        pass
+
+    def _write_chunk(self, arrays: Dict[str, np.ndarray], rows: int):
+        raise NotImplementedError
+
+    def _finish(self):
+        pass
+
+
+class CSVWriter(ResultWriter):
+    """Header cells are `name [unit]`, or bare `name` for text; missing values are empty cells."""
+
+    def _write_header(self):
+        self.writer = csv.writer(self.file)
+        self.writer.writerow([column.name if column.unit is None else f"{column.name} [{column.unit}]"
+                              for column in self.columns])
+
+    def _write_chunk(self, arrays, rows):
+        cells = [[('' if value != value else value) for value in arrays[column.name].tolist()]
+                 for column in self.columns]
+        self.writer.writerows(zip(*cells))
+
+
+class JSONLWriter(ResultWriter):
+    """First line `{"columns": [{"name", "unit"}]}`, then one object of magnitudes per row."""
+
+    def _write_header(self):
+        self.file.write(json.dumps({'columns': [column._asdict() for column in self.columns]}) + '\n')
+
+    def _write_chunk(self, arrays, rows):
+        values = [(column.name, arrays[column.name].tolist()) for column in self.columns]
+        self.file.write(''.join(
+            json.dumps({name: column[i] for name, column in values if column[i] == column[i] and column[i] != ''}) + '\n'
+            for i in range(rows)))
+
+
+class ColumnarWriter(ResultWriter):
+    """Binary columnar file; see the module docstring for the layout."""
+    binary = True
+
+    def _write_header(self):
+        self.file.write(MAGIC)
+        self.offset = len(MAGIC)
+        self.row_groups = []
+        self.strings = {column.name: {} for column in self.columns if column.unit is None}
+
+    def _write_chunk(self, arrays, rows):
+        self.row_groups.append({'offset': self.offset, 'rows': rows})
+        for column in self.columns:
+            if column.unit is None:
+                table = self.strings[column.name]
+                block = np.array([table.setdefault(value, len(table)) if value != '' else -1
+                                  for value in arrays[column.name]], dtype='<i4')
+            else:
+                block = arrays[column.name].astype('<f8')
+            padding = -block.nbytes % 8
+            self.file.write(block.tobytes() + b'\0' * padding)
+            self.offset += block.nbytes + padding
+
+    def _finish(self):
+        footer = json.dumps({
+            'version': 1,
+            'columns': [column._asdict() for column in self.columns],
+            'row_groups': self.row_groups,
+            'strings': {name: list(table) for name, table in self.strings.items()},
+        }).encode()
+        self.file.write(footer + struct.pack('<Q', len(footer)) + MAGIC)
+
+
+WRITERS = {'csv': CSVWriter, 'jsonl': JSONLWriter, 'columnar': ColumnarWriter}
+
+
+def open_writer(target: Target, columns: Dict[str, Any] = None, format: str = None,
+                chunk_size: int = CHUNK_SIZE) -> ResultWriter:
+    return WRITERS[_format(target, format)](target, columns, chunk_size)
+
+
+def write_results(rows: Iterable[Dict[str, Any]], target: Target, columns: Dict[str, Any] = None,
+                  format: str = None, chunk_size: int = CHUNK_SIZE) -> int:
+    """Stream `rows` to `target`; returns the number of rows written."""
+    with open_writer(target, columns, format, chunk_size) as writer:
+        return writer.write(rows)
+
+
+class ResultReader:
+    """Reads a written file back as column chunks or as rows of Quantities."""
+    columns: List[Column]
+
+    def chunks(self) -> Iterator[Dict[str, np.ndarray]]:
+        raise NotImplementedError
+
+    def rows(self) -> Iterator[Dict[str, Any]]:
+        """Rows as dicts of Quantities (floats for dimensionless, str for text), without missing values."""
+        units = [(column.name, column.unit is None, None if column.unit in (None, DIMENSIONLESS)
+                  else ureg.Unit(column.unit)) for column in self.columns]
+        for chunk in self.chunks():
+            values = [(name, text, unit, chunk[name].tolist()) for name, text, unit in units]
+            for i in range(len(values[0][3]) if values else 0):
+                row = {}
+                for name, text, unit, column in values:
+                    value = column[i]
+                    if text:
+                        if value != '':
+                            row[name] = value
+                    elif value == value:
+                        row[name] = value if unit is None else ureg.Quantity(value, unit)
+                yield row
+
+    def column(self, name: str) -> np.ndarray:
+        """All values of one column."""
+        parts = list(self._column_parts(name))
+        if not parts:
+            return np.array([], dtype=float if self._column(name).unit is not None else object)
+        return parts[0] if len(parts) == 1 else np.concatenate(parts)
+
+    def quantity(self, name: str):
+        """A numeric column as a Quantity array."""
+        return self.column(name) * ureg.Unit(self._column(name).unit)
+
+    def _column_parts(self, name: str) -> Iterator[np.ndarray]:
+        return (chunk[name] for chunk in self.chunks())
+
+    def _column(self, name: str) -> Column:
+        for column in self.columns:
+            if column.name == name:
+                return column
+        raise KeyError(name)
+
+
+class _StreamReader(ResultReader):
+    """Base for the line-oriented formats; re-reads the file on each pass."""
+
+    def __init__(self, path: Union[str, os.PathLike], chunk_size: int = CHUNK_SIZE):
+        self.path = path
+        self.chunk_size = chunk_size
+        with self._open() as file:
+            self.columns = self._read_header(file)
+
+    def _open(self):
+        return open(self.path, newline='', encoding='utf-8')
+
+    def chunks(self):
+        with self._open() as file:
+            self._read_header(file)
+            records = self._records(file)
+            for chunk in iter(lambda: list(itertools.islice(records, self.chunk_size)), []):
+                yield {column.name: self._array(column, [record[i] for record in chunk])
+                       for i, column in enumerate(self.columns)}
+
+    @staticmethod
+    def _array(column: Column, values: List) -> np.ndarray:
+        if column.unit is None:
+            return np.array(['' if value is None else value for value in values], dtype=object)
+        return np.array([np.nan if value in (None, '') else float(value) for value in values])
+
+
+class CSVReader(_StreamReader):
+
+    def _read_header(self, file) -> List[Column]:
+        header = next(csv.reader(file), [])
+        return [Column(*match.groups()) if (match := _HEADER.match(cell)) else Column(cell, None) for cell in header]
+
+    def _records(self, file):
+        return csv.reader(file)
+
+
+class JSONLReader(_StreamReader):
+
+    def _read_header(self, file) -> List[Column]:
+        line = file.readline()
+        return [Column(**column) for column in json.loads(line)['columns']] if line.strip() else []
+
+    def _records(self, file):
+        names = [column.name for column in self.columns]
+        return ([record.get(name) for name in names] for record in map(json.loads, file) if record)
+
+
+class ColumnarReader(ResultReader):
+    """Memory-maps a .zcol file; chunks and single-group columns are views into the mapping."""
+
+    def __init__(self, path: Union[str, os.PathLike]):
+        self.path = path
+        self.data = np.memmap(path, dtype=np.uint8, mode='r')
+        if len(self.data) < 2 * len(MAGIC) + 8 or bytes(self.data[:8]) != MAGIC or bytes(self.data[-8:]) != MAGIC:
+            raise ValueError(f"{path} is not a zylo columnar file")
+        length, = struct.unpack('<Q', bytes(self.data[-16:-8]))
+        footer = json.loads(bytes(self.data[-16 - length:-16]))
+        self.columns = [Column(**column) for column in footer['columns']]
+        self.row_groups = footer['row_groups']
+        # Code -1 (missing) indexes the trailing ''
+        self.strings = {name: np.array(values + [''], dtype=object) for name, values in footer['strings'].items()}
+
+    def __len__(self) -> int:
+        return sum(group['rows'] for group in self.row_groups)
+
+    def chunks(self):
+        for group in self.row_groups:
+            yield self._row_group(group)
+
+    def _column_parts(self, name: str) -> Iterator[np.ndarray]:
+        column = self._column(name)
+        return (self._row_group(group, [column])[name] for group in self.row_groups)
+
+    def _row_group(self, group: Dict[str, int], columns: List[Column] = None) -> Dict[str, np.ndarray]:
+        wanted = self.columns if columns is None else columns
+        offset, rows, arrays = group['offset'], group['rows'], {}
+        for column in self.columns:
+            size = rows * (4 if column.unit is None else 8)
+            if column in wanted:
+                block = self.data[offset:offset + size]
+                arrays[column.name] = (self.strings[column.name][block.view('<i4')] if column.unit is None
+                                       else block.view('<f8'))
+            offset += size + (-size % 8)
+        return arrays
+
+
+def read_results(path: Union[str, os.PathLike], format: str = None, chunk_size: int = CHUNK_SIZE) -> ResultReader:
+    """Reader for a file written by `write_results`; `chunk_size` applies to CSV and JSONL."""
+    format = _format(path, format)
+    if format == 'columnar':
+        return ColumnarReader(path)
+    return {'csv': CSVReader, 'jsonl': JSONLReader}[format](path, chunk_size)
@@ -1,7 +1,18 @@
 from zylo.core.physics.mechanics import mechanics
 from zylo.core.physics.conversions import ureg
-from zylo.core.data.materials_db import MATERIALS_DB
+from zylo.core.data.materials_db import materials
+from zylo.core import metrics
+from zylo.core.math import result_cache
+from zylo.core.workflow import uncertainty
 import math
+from functools import partial
+
+import pint
+
+MM_PER_M = 1000.0
+
+# Equations solved together by run(): kessel thickness, allowable stress, piston area and bore
+SIZING_EQUATIONS = ['kessel', 'sigma_allow', 'force', 'circle_area', 'diameter']
 
 class HydraulicCylinderWorkflow:
     """
@@ -24,43 +35,182 @@ class HydraulicCylinderWorkflow:
     - Symbols should use consistent units (mm, N/mm²) for this calculation.
     - For thick-walled cylinders, a more advanced formula may be needed.
     """
-    def __init__(self, force, pressure, stroke, material_name, safety_factor=1.5):
-        self.force = force.to(ureg.newton)
-        self.pressure = pressure.to(ureg.pascal)
-        self.stroke = stroke.to(ureg.meter)
-        self.material = MATERIALS_DB[material_name]
+    # Units of the values returned by run()
+    RESULT_UNITS = {
+        'bore_diameter': ureg.millimeter,
+        'wall_thickness': ureg.millimeter,
+        'outer_diameter': ureg.millimeter,
+        'pipe_wall_mass': ureg.kilogram,
+        'bottom_thickness': ureg.millimeter,
+    }
+
+    def __init__(self, force, pressure, stroke, material_name, safety_factor=1.5, fast_units=False):
+        self.material_name = material_name
+        self.material = materials()[material_name]
         self.safety_factor = safety_factor
-        self.calc = mechanics("Cylinder Workflow")
+        self.calc = mechanics("Cylinder Workflow", fast_units=fast_units)
+        self.fast_units = fast_units
+        if fast_units:
+            # Dimensions are checked here once; run() works on SI floats only
+            solver = self.calc.solver
+            self._si = {
+                'force': solver.to_si('F', force),
+                'pressure': solver.to_si('P', pressure),
+                'stroke': solver.to_si('L', stroke),
+                'yield_strength': solver.to_si('yield_strength', self.material['yield_strength']),
+                'density': solver.to_si('rho', self.material['density']),
+                'safety_factor': solver.to_si('safety_factor', safety_factor),
+            }
+            self.force = self._si['force'] * ureg.newton
+            self.pressure = self._si['pressure'] * ureg.pascal
+            self.stroke = self._si['stroke'] * ureg.meter
+        else:
+            self.force = force.to(ureg.newton)
+            self.pressure = pressure.to(ureg.pascal)
+            self.stroke = stroke.to(ureg.meter)
 
     def run(self):
-        # Calculate wall thickness directly - let auto-substitution handle everything
-        p_Nmm2 = self.pressure.to(ureg.newton / ureg.millimeter**2)
-        
-        # Single solve call handles the entire chain automatically
-        wall_thickness_mm = self.calc.solve(
+        key = self._cache_key()
+        if key is not None:
+            results = result_cache.WORKFLOW_CACHE.get(key, None)
+            if results is not None:
+                return dict(results)
+        results = self._compute()
+        if key is not None:
+            result_cache.WORKFLOW_CACHE.put(key, dict(results))
+        return results
+
+    def _compute(self):
+        """Run without the result cache."""
+        metrics.count('workflow_runs')
+        with metrics.timed('workflow_run_fast' if self.fast_units else 'workflow_run'):
+            return self._run_fast() if self.fast_units else self._run()
+
+    async def run_async(self, executor=None, timeout: float = None):
+        """Awaitable run: inline when memoized or the sizing plan is compiled, otherwise on an
+        executor, shared by concurrent runs with the same inputs (see zylo.core.aio).
+        """
+        from zylo.core import aio
+        key = self._request_key()
+        # One lookup per request, so the cache statistics count each run once
+        cached = key is not None and result_cache.WORKFLOW_CACHE.maxsize > 0
+        if cached:
+            results = result_cache.WORKFLOW_CACHE.get(key, None)
+            if results is not None:
+                metrics.count('async_inline')
+                return dict(results)
+        if self.calc.solver.is_system_compiled(SIZING_EQUATIONS, self._sizing_inputs(), ['t', 'd']):
+            metrics.count('async_inline')
+            results = self._compute()
+        else:
+            # Picklable for process executors: SI inputs in, the worker builds its own workflow
+            task = partial(_run_task, self.force.magnitude, self.pressure.magnitude, self.stroke.magnitude,
+                           self.material_name, self.calc.solver.to_si('safety_factor', self.safety_factor),
+                           self.fast_units)
+            results = await aio.run_coalesced(key and ('workflow',) + key, task, executor, timeout)
+            results = {name: ureg.Quantity(magnitude, units) for name, (magnitude, units) in results.items()}
+        if cached:
+            result_cache.WORKFLOW_CACHE.put(key, dict(results))
+        return results
+
+    def _cache_key(self):
+        """Memoization key: SI force, pressure and stroke, material name and safety factor."""
+        if result_cache.WORKFLOW_CACHE.maxsize <= 0:
+            return None
+        return self._request_key()
+
+    def _request_key(self):
+        try:
+            safety_factor = self.calc.solver.to_si('safety_factor', self.safety_factor)
+        except pint.DimensionalityError:
+            return None
+        key = tuple(result_cache.normalize(value) for value in (
+            self.force.magnitude, self.pressure.magnitude, self.stroke.magnitude, safety_factor))
+        if None in key:
+            return None
+        return (self.calc.solver, self.material_name) + key
+
+    def _sizing_inputs(self):
+        """Known values of the sizing system; the compiled plan is keyed on these names."""
+        return {'P': self.pressure, 'F': self.force, 'yield_strength': self.material['yield_strength'],
+                'safety_factor': self.safety_factor}
+
+    def _run(self):
+        # One system solve covers wall thickness, allowable stress, piston area and bore
+        sizing = self.calc.solve_system(SIZING_EQUATIONS, ['t', 'd'], **self._sizing_inputs())
+        return self._dimensions(sizing['d'].to(ureg.meter).magnitude, sizing['t'].to(ureg.meter).magnitude,
+                                self.stroke.magnitude, self.material['density'].to_base_units().magnitude)
+
+    def _run_fast(self):
+        si = self._si
+        sizing = self.calc.solve_system_values(
+            SIZING_EQUATIONS,
+            ['t', 'd'],
+            P=si['pressure'],
+            F=si['force'],
+            yield_strength=si['yield_strength'],
+            safety_factor=si['safety_factor']
+        )
+        return self._dimensions(sizing['d'], sizing['t'], si['stroke'], si['density'])
+
+    def sensitivities(self) -> dict:
+        """Derivatives of the sized bore and wall w.r.t. the inputs at this design point.
+
+        Returns {output: {input: Quantity}} in SI units, e.g.
+        `workflow.sensitivities()['wall_thickness']['pressure'].to('mm/bar')`.
+        """
+        inputs = {'force': 'F', 'pressure': 'P', 'yield_strength': 'yield_strength', 'safety_factor': 'safety_factor'}
+        jacobian = self.calc.jacobian(SIZING_EQUATIONS, ['t', 'd'], wrt=list(inputs.values()), F=self.force,
+                                      P=self.pressure, yield_strength=self.material['yield_strength'],
+                                      safety_factor=self.safety_factor)
+        return {output: {name: jacobian[target][symbol] for name, symbol in inputs.items()}
+                for output, target in (('bore_diameter', 'd'), ('wall_thickness', 't'))}
+
+    def run_uncertainty(self, distributions: dict, samples: int = 100_000, percentiles=(5, 50, 95), seed=None) -> dict:
+        """Monte Carlo run: percentiles of the results and the probability of exceeding the allowable stress.
+
+        `distributions` maps inputs, material properties and designed dimensions to
+        Distributions (see zylo.core.workflow.uncertainty); all samples are evaluated vectorized.
+        """
+        return uncertainty.propagate(self, distributions, samples, percentiles, seed)
+
+    @classmethod
+    def run_batch(cls, force, pressure, stroke, yield_strength, density, safety_factor=1.5):
+        """Vectorized run() over arrays of inputs and material properties, broadcast against each other."""
+        metrics.count('workflow_batch_runs')
+        calc = mechanics("Cylinder Workflow")
+        wall_thickness = calc.solve_batch(
             'kessel',
-            P=p_Nmm2,
-            F=self.force,
-            yield_strength=self.material['yield_strength'],
-            safety_factor=self.safety_factor
-        ).to(ureg.millimeter)
-        
-        # Calculate other needed values using the solver too
-        area = self.calc.solve('force', F=self.force, P=self.pressure).to(ureg.meter**2)
-        bore_diameter_m = self.calc.solve('circle_area', A=area).to(ureg.meter) * 2  # diameter = 2*radius
-        bore_diameter_mm = bore_diameter_m.to(ureg.millimeter)
-
-        # Rest of calculations stay the same...
-        outer_diameter_mm = bore_diameter_mm + 2 * wall_thickness_mm
-        r_outer_m = (outer_diameter_mm / 2).to(ureg.meter)
-        r_inner_m = (bore_diameter_mm / 2).to(ureg.meter)
-        wall_volume = (math.pi * self.stroke * (r_outer_m**2 - r_inner_m**2)).to(ureg.meter**3)
-        wall_mass = (self.material['density'] * wall_volume).to(ureg.kilogram)
+            P=pressure,
+            F=force,
+            yield_strength=yield_strength,
+            safety_factor=safety_factor
+        )
+        area = calc.solve_batch('force', F=force, P=pressure).to(ureg.meter**2)
+        bore_diameter = calc.solve_batch('circle_area', A=area) * 2
+        return cls._dimensions(bore_diameter.to(ureg.meter).magnitude, wall_thickness.to(ureg.meter).magnitude,
+                               stroke.to(ureg.meter).magnitude, density.to_base_units().magnitude)
+
+    @staticmethod
+    def _dimensions(bore_diameter_m, wall_thickness_m, stroke_m, density):
+        # SI magnitudes (floats or arrays) in; every run path goes through here so they agree exactly
+        outer_diameter_m = bore_diameter_m + 2 * wall_thickness_m
+        wall_volume = math.pi * stroke_m * ((outer_diameter_m / 2)**2 - (bore_diameter_m / 2)**2)
+        wall_mass = density * wall_volume
 
+        # Units are attached only to the returned values
         return {
-            'bore_diameter': bore_diameter_mm,
-            'wall_thickness': wall_thickness_mm,
-            'outer_diameter': outer_diameter_mm,
-            'pipe_wall_mass': wall_mass.to(ureg.kilogram),
-            'bottom_thickness': wall_thickness_mm*3
-        }
\ No newline at end of file
+            'bore_diameter': bore_diameter_m * MM_PER_M * ureg.millimeter,
+            'wall_thickness': wall_thickness_m * MM_PER_M * ureg.millimeter,
+            'outer_diameter': outer_diameter_m * MM_PER_M * ureg.millimeter,
+            'pipe_wall_mass': wall_mass * ureg.kilogram,
+            'bottom_thickness': wall_thickness_m * MM_PER_M * ureg.millimeter * 3
+        }
+
+
+def _run_task(force: float, pressure: float, stroke: float, material_name: str, safety_factor: float,
+              fast_units: bool):
+    """run_async work item: SI inputs in, {name: (magnitude, units)} out, so it runs in any executor."""
+    results = HydraulicCylinderWorkflow(force * ureg.newton, pressure * ureg.pascal, stroke * ureg.meter,
+                                        material_name, safety_factor, fast_units=fast_units)._compute()
+    return {name: (value.magnitude, str(value.units)) for name, value in results.items()}
@@ -0,0 +1,198 @@
+"""
+Parametric sweeps of HydraulicCylinderWorkflow across a process pool.
+
+The Cartesian product of the inputs is split into chunks that run on worker
+processes with the solver already loaded. Results stream back as chunks finish
+but are yielded in product order, so a sweep's output is deterministic.
+
+CLI:
+    python -m zylo.core.workflow.sweep --force 500kN:1500kN:5 --pressure 200bar 300bar \
+        --stroke 1m --material S355 S235 --safety-factor 1.5 2.0 > sweep.csv
+
+Results stream to CSV on stdout, or with `--output` to a CSV, JSONL or binary
+columnar file (see zylo.core.workflow.export).
+"""
+import argparse
+import itertools
+import os
+import sys
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+import numpy as np
+
+from zylo.core.physics.conversions import ureg
+from zylo.core.data.materials_db import materials
+from zylo.core.workflow import export
+from zylo.core.workflow.hydraulic_cylinder_workflow import HydraulicCylinderWorkflow
+
+# Workflow inputs in product order, with the SI unit they are shipped to workers in
+SWEEP_INPUTS = {
+    'force': ureg.newton,
+    'pressure': ureg.pascal,
+    'stroke': ureg.meter,
+    'material_name': None,
+    'safety_factor': None,
+}
+# Export schema of a sweep row: inputs, workflow results and the error message of failed points
+SWEEP_COLUMNS = {
+    **{name: unit if unit is not None else float for name, unit in SWEEP_INPUTS.items()},
+    'material_name': str,
+    **HydraulicCylinderWorkflow.RESULT_UNITS,
+    'error': str,
+}
+
+
+def warm_worker():
+    """Process pool initializer: load the shared solver once per worker."""
+    from zylo.core.physics.mechanics import mechanics
+    mechanics("Sweep worker")
+
+
+def run_point(force: float, pressure: float, stroke: float, material_name: str, safety_factor: float) -> Dict[str, Any]:
+    """Run one workflow from SI floats; returns {name: (magnitude, units)} or {'error': message}."""
+    try:
+        results = HydraulicCylinderWorkflow(
+            force=force * ureg.newton,
+            pressure=pressure * ureg.pascal,
+            stroke=stroke * ureg.meter,
+            material_name=material_name,
+            safety_factor=safety_factor,
+            fast_units=True,
+        ).run()
+    except Exception as e:
+        return {'error': f"{type(e).__name__}: {e}"}
+    return {name: (value.magnitude, str(value.units)) for name, value in results.items()}
+
+
+def run_chunk(points: List[Tuple]) -> List[Dict[str, Any]]:
+    return [run_point(*point) for point in points]
+
+
+def to_quantities(raw: Dict[str, Any]) -> Dict[str, Any]:
+    """Rebuild Quantities from a `run_point` result."""
+    if 'error' in raw:
+        return dict(raw)
+    return {name: ureg.Quantity(magnitude, units) for name, (magnitude, units) in raw.items()}
+
+
+def _sweep_values(name: str, value) -> List:
+    """Normalize one sweep input (scalar, list or Quantity array) to a list of SI floats or names."""
+    unit = SWEEP_INPUTS[name]
+    if isinstance(value, ureg.Quantity):
+        return [float(v) for v in np.atleast_1d(value.to(unit or ureg.dimensionless).magnitude)]
+    if isinstance(value, str) or np.isscalar(value):
+        value = [value]
+    if unit is None:
+        return list(value)
+    return [float(v.to(unit).magnitude) if isinstance(v, ureg.Quantity) else float(v) for v in value]
+
+
+def sweep(force, pressure, stroke, material_name, safety_factor=1.5, processes: int = None,
+          chunk_size: int = 64, progress: Callable[[int, int], None] = None) -> Iterator[Tuple[Dict, Dict]]:
+    """Run the workflow over the Cartesian product of the inputs.
+
+    Each input may be a single value, a list, or a Quantity array (e.g. `np.linspace(...) * ureg.bar`).
+    Yields `(inputs, results)` pairs in product order; failed points carry `{'error': message}`.
+    `processes=1` runs in-process without a pool. `progress(done, total)` is called after each chunk.
+    """
+    axes = [_sweep_values(name, value) for name, value in
+            zip(SWEEP_INPUTS, (force, pressure, stroke, material_name, safety_factor))]
+    unknown = set(axes[3]) - set(materials())
+    if unknown:
+        raise ValueError(f"Unknown materials: {sorted(unknown)}")
+    total = int(np.prod([len(axis) for axis in axes]))
+    points = itertools.product(*axes)
+    chunks = iter(lambda: list(itertools.islice(points, chunk_size)), [])
+
+    done = 0
+    for chunk, raw_results in _run_chunks(chunks, processes):
+        for point, raw in zip(chunk, raw_results):
+            inputs = {name: (value * unit if unit is not None else value)
+                      for (name, unit), value in zip(SWEEP_INPUTS.items(), point)}
+            yield inputs, to_quantities(raw)
+        done += len(chunk)
+        if progress is not None:
+            progress(done, total)
+
+
+def _run_chunks(chunks: Iterator[List[Tuple]], processes: int = None) -> Iterator[Tuple[List[Tuple], List]]:
+    """Run chunks on a pool, yielding them in submission order with a bounded number in flight."""
+    if processes == 1:
+        warm_worker()
+        for chunk in chunks:
+            yield chunk, run_chunk(chunk)
+        return
+
+    processes = processes or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=processes, initializer=warm_worker) as pool:
+        max_in_flight = 2 * processes
+        pending = {}
+        finished = {}
+        next_submit = next_yield = 0
+        while True:
+            while len(pending) + len(finished) < max_in_flight:
+                chunk = next(chunks, None)
+                if chunk is None:
+                    break
+                pending[pool.submit(run_chunk, chunk)] = (next_submit, chunk)
+                next_submit += 1
+            if not pending and not finished:
+                return
+            while next_yield in finished:
+                yield finished.pop(next_yield)
+                next_yield += 1
+            if pending:
+                completed, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in completed:
+                    index, chunk = pending.pop(future)
+                    finished[index] = (chunk, future.result())
+
+
+def _parse_axis(values: List[str], numeric: bool = True) -> List:
+    """Parse CLI values; `start:stop:num` expands to a linear range."""
+    axis = []
+    for value in values:
+        if not numeric:
+            axis.extend(materials() if value == 'all' else [value])
+        elif value.count(':') == 2:
+            start, stop, num = value.split(':')
+            start, stop = ureg.Quantity(start), ureg.Quantity(stop)
+            axis.extend(np.linspace(start.magnitude, stop.to(start.units).magnitude, int(num)) * start.units)
+        else:
+            axis.append(ureg.Quantity(value))
+    return axis
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Parametric sweep of the hydraulic cylinder workflow.")
+    parser.add_argument('--force', nargs='+', required=True, help="e.g. 1000kN or 500kN:1500kN:5")
+    parser.add_argument('--pressure', nargs='+', required=True, help="e.g. 300bar or 200bar:400bar:9")
+    parser.add_argument('--stroke', nargs='+', required=True, help="e.g. 1m")
+    parser.add_argument('--material', nargs='+', required=True, help="Material names, or 'all'")
+    parser.add_argument('--safety-factor', nargs='+', default=['1.5'])
+    parser.add_argument('--processes', type=int, default=None)
+    parser.add_argument('--chunk-size', type=int, default=64)
+    parser.add_argument('--output', help="Result file (.csv, .jsonl or .zcol); CSV on stdout by default")
+    parser.add_argument('--quiet', action='store_true', help="Disable progress reporting on stderr")
+    args = parser.parse_args(argv)
+
+    def report(done, total):
+        print(f"\r{done}/{total} designs", end='' if done < total else '\n', file=sys.stderr, flush=True)
+
+    results = sweep(
+        force=_parse_axis(args.force),
+        pressure=_parse_axis(args.pressure),
+        stroke=_parse_axis(args.stroke),
+        material_name=_parse_axis(args.material, numeric=False),
+        safety_factor=[float(v) for v in args.safety_factor],
+        processes=args.processes,
+        chunk_size=args.chunk_size,
+        progress=None if args.quiet else report,
+    )
+    rows = ({**inputs, **outputs} for inputs, outputs in results)
+    export.write_results(rows, args.output or sys.stdout, SWEEP_COLUMNS, format=None if args.output else 'csv')
+
+
+if __name__ == '__main__':
+    main()
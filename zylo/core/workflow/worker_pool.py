@@ -0,0 +1,111 @@
+"""
+Warm process pool serving HydraulicCylinderWorkflow runs to async callers.
+
+Symbolic work holds the GIL, so web requests hand workflow runs to worker
+processes that load the solver once at startup (the sweep's `warm_worker`).
+A batch of runs is split into one chunk per worker, so throughput scales with
+cores. The pool is created on first use and sized by ZYLO_WORKERS (default:
+CPU count).
+"""
+import asyncio
+import atexit
+import math
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Tuple
+
+import pint
+
+from zylo.core.physics.conversions import ureg
+from zylo.core.data.materials_db import materials
+from zylo.core.workflow.sweep import SWEEP_INPUTS, run_chunk, warm_worker
+
+MAX_BATCH = 1000
+MAX_CHUNK = 64
+
+_pool = None
+_lock = threading.Lock()
+
+
+def worker_count() -> int:
+    return int(os.environ.get('ZYLO_WORKERS') or os.cpu_count() or 1)
+
+
+def get_pool() -> ProcessPoolExecutor:
+    """Return the shared pool, starting and warming its workers on first use."""
+    global _pool
+    if _pool is None:
+        with _lock:
+            if _pool is None:
+                _pool = ProcessPoolExecutor(max_workers=worker_count(), initializer=warm_worker)
+                atexit.register(shutdown)
+    return _pool
+
+
+def shutdown():
+    global _pool
+    with _lock:
+        if _pool is not None:
+            _pool.shutdown(cancel_futures=True)
+            _pool = None
+
+
+def parse_point(data: Dict[str, Any]) -> Tuple:
+    """Validate one JSON run description and convert it to the SI tuple `run_point` takes.
+
+    Quantities are given as "300 bar", {"value": 300, "units": "bar"}, or a bare
+    number in SI units. Raises ValueError for missing fields, unknown materials,
+    wrong dimensions and values that are not positive.
+    """
+    if not isinstance(data, dict):
+        raise ValueError("Each run must be a JSON object")
+    point = []
+    for name, unit in SWEEP_INPUTS.items():
+        value = data.get(name, 1.5 if name == 'safety_factor' else None)
+        if value is None:
+            raise ValueError(f"Missing '{name}'")
+        if name == 'material_name':
+            if not isinstance(value, str) or value not in materials():
+                raise ValueError(f"Unknown material '{value}'")
+            point.append(value)
+            continue
+        try:
+            if isinstance(value, dict):
+                value = ureg.Quantity(float(value['value']), value.get('units') or '')
+            elif isinstance(value, str):
+                value = ureg.Quantity(value)
+            if isinstance(value, ureg.Quantity):
+                value = value.to(unit or ureg.dimensionless).magnitude
+            magnitude = float(value)
+        except (KeyError, TypeError, ValueError, pint.errors.PintError) as e:
+            raise ValueError(f"Invalid '{name}': {e}") from None
+        if not (math.isfinite(magnitude) and magnitude > 0):
+            raise ValueError(f"Invalid '{name}': not a finite positive number")
+        point.append(magnitude)
+    return tuple(point)
+
+
+async def run_points(points: List[Tuple]) -> List[Dict[str, Any]]:
+    """Run SI points on the pool concurrently; results are `run_point` dicts in input order."""
+    if not points:
+        return []
+    loop = asyncio.get_running_loop()
+    pool = get_pool()
+    size = min(MAX_CHUNK, math.ceil(len(points) / worker_count()))
+    chunks = [points[i:i + size] for i in range(0, len(points), size)]
+    results = await asyncio.gather(*(loop.run_in_executor(pool, run_chunk, chunk) for chunk in chunks))
+    return [raw for chunk_results in results for raw in chunk_results]
+
+
+def annotate(raw: Dict[str, Any]) -> Dict[str, Any]:
+    """JSON form of a `run_point` result: {name: {"value": ..., "units": ...}} or {"error": ...}.
+
+    Results with a non-finite value are reported as errors.
+    """
+    if 'error' in raw:
+        return dict(raw)
+    invalid = [name for name, (magnitude, _) in raw.items() if not math.isfinite(magnitude)]
+    if invalid:
+        return {'error': f"Non-finite result for {', '.join(invalid)}"}
+    return {name: {'value': magnitude, 'units': units} for name, (magnitude, units) in raw.items()}
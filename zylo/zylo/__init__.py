@@ -0,0 +1,6 @@
+# manage.py, wsgi.py and asgi.py run with this directory's parent on sys.path, where
+# `zylo` is this settings package. Extend it with the project directory so the app and
+# the solver library import as zylo.core, as they do from the repository root.
+import os
+
+__path__.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))